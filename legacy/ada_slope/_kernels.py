@@ -0,0 +1,235 @@
+"""Optional Numba kernels for the hot numeric loops.
+
+Numba is an optional dependency. When it is not installed ``HAS_NUMBA`` is False,
+``njit`` becomes a no-op decorator and callers in :mod:`ada_slope.core` use their
+NumPy implementations instead.
+
+Kernels take bare NumPy arrays and write into caller-allocated outputs. They do not
+use ``fastmath`` because it lets LLVM assume there are no NaNs, and NaN is how
+missing elevations are represented throughout the package.
+"""
+from __future__ import annotations
+
+import math
+import os
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # numba is optional
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def prefer_omp_threading() -> None:
+    """Make Numba try the OpenMP threading layer before TBB.
+
+    For servers that launch kernels from worker threads: TBB's pool can deadlock
+    at interpreter exit when it was first entered off the main thread. This
+    changes Numba's process-wide configuration, so it is left to applications to
+    call, before the first parallel kernel runs. A ``NUMBA_THREADING_LAYER_PRIORITY``
+    set in the environment takes precedence.
+    """
+    if HAS_NUMBA and "NUMBA_THREADING_LAYER_PRIORITY" not in os.environ:
+        numba.config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+
+
+@njit(parallel=True, cache=True)
+def slope_kernel(x, y, elev, groups, half_window, threshold, out_slope, out_compliant):
+    """Slope between the end points of every centred window of ``2*half_window+1`` points.
+
+    Points must be ordered so that each group (path) is contiguous. Windows spanning
+    two groups or containing a NaN elevation are left as NaN / False in the outputs.
+    """
+    n = x.shape[0]
+    for i in prange(half_window, n - half_window):
+        a = i - half_window
+        b = i + half_window
+
+        valid = groups[a] == groups[b]
+        for k in range(a, b + 1):
+            if not valid or math.isnan(elev[k]):
+                valid = False
+                break
+        if not valid:
+            out_slope[i] = np.nan
+            out_compliant[i] = False
+            continue
+
+        dx = x[b] - x[a]
+        dy = y[b] - y[a]
+        dist = math.sqrt(dx * dx + dy * dy)
+        slope = (elev[b] - elev[a]) / dist if dist != 0.0 else 0.0
+        out_slope[i] = slope
+        out_compliant[i] = abs(slope) <= threshold
+
+
+@njit(parallel=True, cache=True)
+def segment_slope_kernel(x, y, elev, groups, out_slope):
+    """Slope between each pair of consecutive points, written to ``out_slope[i]``.
+
+    Points must be ordered so that each group (path) is contiguous. Pairs spanning
+    two groups or with a missing elevation at either end are NaN.
+    """
+    for i in prange(x.shape[0] - 1):
+        rise = elev[i + 1] - elev[i]
+        if groups[i] != groups[i + 1] or not math.isfinite(rise):
+            out_slope[i] = np.nan
+            continue
+        dx = x[i + 1] - x[i]
+        dy = y[i + 1] - y[i]
+        dist = math.sqrt(dx * dx + dy * dy)
+        out_slope[i] = rise / dist if dist != 0.0 else 0.0
+
+
+@njit(cache=True)
+def _gradient_at(dem, i, j, resx, resy):
+    """``np.gradient`` (edge_order=1) of ``dem`` at pixel ``(i, j)``, as ``(gx, gy)``."""
+    nrows, ncols = dem.shape
+    if i == 0:
+        gy = (dem[1, j] - dem[0, j]) / resy
+    elif i == nrows - 1:
+        gy = (dem[i, j] - dem[i - 1, j]) / resy
+    else:
+        gy = (dem[i + 1, j] - dem[i - 1, j]) / (2.0 * resy)
+    if j == 0:
+        gx = (dem[i, 1] - dem[i, 0]) / resx
+    elif j == ncols - 1:
+        gx = (dem[i, j] - dem[i, j - 1]) / resx
+    else:
+        gx = (dem[i, j + 1] - dem[i, j - 1]) / (2.0 * resx)
+    return gx, gy
+
+
+@njit(parallel=True, cache=True)
+def gradient_points_kernel(dem, rows, cols, resx, resy, out_gx, out_gy):
+    """``np.gradient`` of ``dem`` at pixels ``(rows[k], cols[k])``, which must lie inside it."""
+    for k in prange(rows.shape[0]):
+        gx, gy = _gradient_at(dem, rows[k], cols[k], resx, resy)
+        out_gx[k] = gx
+        out_gy[k] = gy
+
+
+@njit(cache=True)
+def _bin_index(value, edges):
+    """Bin of ``value`` in uniform ``edges`` following ``np.histogram``, or -1.
+
+    Values outside the range and NaNs get -1; the last bin is closed on the right.
+    """
+    nbins = edges.shape[0] - 1
+    lo = edges[0]
+    hi = edges[nbins]
+    if not (value >= lo and value <= hi):
+        return -1
+    k = int((value - lo) * (nbins / (hi - lo)))
+    if k == nbins:
+        k -= 1
+    # Same edge correction as np.histogram for rounding in the scale factor
+    if value < edges[k]:
+        k -= 1
+    elif k != nbins - 1 and value >= edges[k + 1]:
+        k += 1
+    return k
+
+
+@njit(parallel=True, cache=True)
+def slope_stats_kernel(
+    dem, resx, resy, row0, row1, col0, col1, run_limit, cross_limit, cross_is_gy, edges, out_hist
+):
+    """Running/cross slope statistics over ``dem[row0:row1, col0:col1]`` in one pass.
+
+    Slopes are percentages computed as in ``compute_running_slope`` and
+    ``compute_cross_slope``, but never materialized. ``dem`` must already have
+    nodata masked to NaN. Running slopes are also binned into ``out_hist`` over
+    ``edges``. Returns ``(total, run_over, cross_over, slope_sum, slope_max)`` where
+    ``total`` counts pixels with a finite running slope.
+    """
+    total = 0
+    run_over = 0
+    cross_over = 0
+    slope_sum = 0.0
+    slope_max = 0.0
+    row_hist = np.zeros((row1 - row0, edges.shape[0] - 1), dtype=np.int64)
+    for i in prange(row0, row1):
+        for j in range(col0, col1):
+            gx, gy = _gradient_at(dem, i, j, resx, resy)
+            cross = abs(gy if cross_is_gy else gx) * 100.0
+            if cross > cross_limit:
+                cross_over += 1
+
+            slope = math.sqrt(gx * gx + gy * gy) * 100.0
+            if math.isnan(slope):
+                continue
+            total += 1
+            slope_sum += slope
+            slope_max = max(slope_max, slope)
+            if slope > run_limit:
+                run_over += 1
+            k = _bin_index(slope, edges)
+            if k >= 0:
+                row_hist[i - row0, k] += 1
+    _add_rows(row_hist, out_hist)
+    return total, run_over, cross_over, slope_sum, slope_max
+
+
+@njit(parallel=True, cache=True)
+def slope_histogram_kernel(dem, resx, resy, row0, row1, col0, col1, edges, out_hist):
+    """Add running slope counts over ``dem[row0:row1, col0:col1]`` to ``out_hist``.
+
+    Bins follow ``np.histogram`` with uniform ``edges`` (see ``_bin_index``).
+    """
+    row_hist = np.zeros((row1 - row0, edges.shape[0] - 1), dtype=np.int64)
+    for i in prange(row0, row1):
+        for j in range(col0, col1):
+            gx, gy = _gradient_at(dem, i, j, resx, resy)
+            k = _bin_index(math.sqrt(gx * gx + gy * gy) * 100.0, edges)
+            if k >= 0:
+                row_hist[i - row0, k] += 1
+    _add_rows(row_hist, out_hist)
+
+
+@njit(cache=True)
+def _add_rows(row_hist, out_hist):
+    # Per-row histograms keep the prange loop free of shared writes
+    for r in range(row_hist.shape[0]):
+        for k in range(row_hist.shape[1]):
+            out_hist[k] += row_hist[r, k]
+
+
+@njit(parallel=True, cache=True)
+def slope_grid_kernel(dem, resx, resy, component, out):
+    """Write a slope raster (percent) for ``dem`` into ``out`` in one pass.
+
+    ``component`` selects the output: 0 for the gradient magnitude (running
+    slope), 1 for ``|gy|`` and 2 for ``|gx|`` (cross slope).
+    """
+    nrows, ncols = dem.shape
+    for i in prange(nrows):
+        for j in range(ncols):
+            gx, gy = _gradient_at(dem, i, j, resx, resy)
+            if component == 0:
+                out[i, j] = math.sqrt(gx * gx + gy * gy) * 100.0
+            elif component == 1:
+                out[i, j] = abs(gy) * 100.0
+            else:
+                out[i, j] = abs(gx) * 100.0
+
+
+@njit(parallel=True, cache=True)
+def slopes_kernel(dem, resx, resy, cross_is_gy, running_out, cross_out):
+    """Write running slope and cross-slope rasters (percent) for ``dem`` in one pass."""
+    nrows, ncols = dem.shape
+    for i in prange(nrows):
+        for j in range(ncols):
+            gx, gy = _gradient_at(dem, i, j, resx, resy)
+            running_out[i, j] = math.sqrt(gx * gx + gy * gy) * 100.0
+            cross_out[i, j] = abs(gy if cross_is_gy else gx) * 100.0
@@ -0,0 +1,82 @@
+"""Small LRU cache of open rasterio datasets.
+
+Opening a GeoTIFF parses its header and sets up GDAL driver state, which dominates
+the cost of sampling a few hundred points. Each thread keeps its own handles,
+because a GDAL dataset must not be read from two threads at once, and only ever
+closes its own: on LRU eviction, when the file's modification time changes, and
+when the thread exits.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Tuple
+
+import rasterio
+from rasterio.io import DatasetReader
+
+# Per thread
+MAX_DATASETS = 256
+
+_lock = threading.Lock()
+_local = threading.local()
+_caches: "weakref.WeakSet[_ThreadCache]" = weakref.WeakSet()
+
+
+class _ThreadCache:
+    """One thread's open datasets, keyed on path. Closed with the thread."""
+
+    def __init__(self) -> None:
+        self.datasets: "OrderedDict[str, Tuple[int, DatasetReader]]" = OrderedDict()
+        with _lock:
+            _caches.add(self)
+
+    def close(self) -> None:
+        while self.datasets:
+            _, (_, src) = self.datasets.popitem()
+            src.close()
+
+    __del__ = close
+
+
+def get_dataset(path: str) -> DatasetReader:
+    """Return a cached read-only dataset for ``path``.
+
+    The handle is owned by the calling thread's cache: callers must not close it,
+    use it as a context manager, or hand it to another thread.
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    cache = getattr(_local, "cache", None)
+    if cache is None:
+        cache = _local.cache = _ThreadCache()
+
+    entry = cache.datasets.get(path)
+    if entry is not None:
+        cached_mtime, src = entry
+        if cached_mtime == mtime and not src.closed:
+            cache.datasets.move_to_end(path)
+            return src
+        # The file was rewritten; this handle is stale
+        del cache.datasets[path]
+        src.close()
+
+    src = rasterio.open(path, sharing=False)
+    cache.datasets[path] = (mtime, src)
+    while len(cache.datasets) > MAX_DATASETS:
+        _, (_, evicted) = cache.datasets.popitem(last=False)
+        evicted.close()
+    return src
+
+
+def close_all() -> None:
+    """Close and forget every thread's cached datasets.
+
+    Meant for shutdown and tests: no other thread may be reading at the time.
+    """
+    with _lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache.close()
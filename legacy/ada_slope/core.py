@@ -4,32 +4,57 @@ This module centralizes numerical algorithms and keeps them pure for easy testin
 """
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional
 
 import numpy as np
+from numpy.typing import DTypeLike
+import pandas as pd
 import geopandas as gpd
-from shapely.geometry import LineString, Polygon, MultiPolygon
+import shapely
+
+from . import _kernels
+from .io import ensure_projected
 
 
 # ADA compliance thresholds
 ADA_RUNNING_SLOPE_THRESHOLD = 0.05  # 5% (1:20)
 ADA_CROSS_SLOPE_THRESHOLD = 0.02083  # 2.083% (1:48)
 
+# shapely.get_type_id codes
+_LINESTRING = 1
+_POLYGON = 3
+_MULTIPOLYGON = 6
+
+# Below this many segments a thread pool costs more than it saves
+PARALLEL_MIN_SEGMENTS = 100_000
+
 
 def convert_polygons_to_lines(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     """Convert Polygon and MultiPolygon geometries to LineStrings.
 
     Returns a new GeoDataFrame with the same CRS.
     """
-    lines = []
-    for geom in gdf.geometry:
-        if isinstance(geom, Polygon):
-            lines.append(LineString(geom.exterior.coords))
-        elif isinstance(geom, MultiPolygon):
-            for poly in geom.geoms:
-                lines.append(LineString(poly.exterior.coords))
-        elif isinstance(geom, LineString):
-            lines.append(geom)
+    geoms = gdf.geometry.values
+    type_ids = shapely.get_type_id(geoms)
+    keep = np.isin(type_ids, (_LINESTRING, _POLYGON, _MULTIPOLYGON)) & ~shapely.is_empty(geoms)
+
+    # Split MultiPolygons into their parts; Polygons and LineStrings pass through
+    parts = shapely.get_parts(geoms[keep])
+    is_polygon = shapely.get_type_id(parts) == _POLYGON
+
+    # Rings keep their dimensionality, like LineStrings passing through; 2D and
+    # 3D rings are rebuilt separately so 2D ones don't gain NaN Z values
+    rings = shapely.get_exterior_ring(parts[is_polygon])
+    ring_pos = np.flatnonzero(is_polygon)
+    has_z = shapely.has_z(rings)
+    lines = parts.copy()
+    for include_z in (False, True):
+        sel = has_z == include_z
+        if sel.any():
+            coords, ring_index = shapely.get_coordinates(rings[sel], include_z=include_z, return_index=True)
+            lines[ring_pos[sel]] = shapely.linestrings(coords, indices=ring_index)
     return gpd.GeoDataFrame(geometry=lines, crs=gdf.crs)
 
 
@@ -42,58 +67,174 @@ def compute_slope_segments(points_gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     Returns:
         GeoDataFrame of LineString segments with columns: path_id, slope, ada_compliant, geometry
     """
-    if points_gdf.crs is None:
-        raise ValueError("Input GeoDataFrame must have a CRS")
-    if points_gdf.crs.is_geographic:
-        # Choose a metric projection for distance-based slope calculations
-        points_gdf = points_gdf.to_crs("EPSG:26917")
+    # Distance-based slopes need a projected CRS
+    points_gdf = ensure_projected(points_gdf)
 
+    # Filter rows with one mask; empty points have no coordinates and would shift
+    # every following point out of line with its elevation
+    geoms = points_gdf.geometry.values
+    usable = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
     if "path_id" in points_gdf.columns:
-        points_gdf = points_gdf.dropna(subset=["path_id"])
-        grouped = points_gdf.groupby("path_id")
-    else:
-        grouped = [(None, points_gdf)]
-
-    segments = []
-    slopes = []
-    compliance = []
-    group_ids = []
+        usable &= points_gdf["path_id"].notna().to_numpy()
+    if not usable.all():
+        points_gdf = points_gdf[usable]
 
-    for group_id, group in grouped:
-        group = group[group.geometry.notnull()]
-        group = group.copy().sort_index().reset_index(drop=True)
-
-        for i in range(len(group) - 1):
-            pt1, pt2 = group.iloc[i], group.iloc[i + 1]
-            if pt1.get("elevation") is None or pt2.get("elevation") is None:
-                continue
+    # One global pass: order points by path, then drop segments spanning two paths
+    order, codes, path_ids = path_order(points_gdf)
+    coords = shapely.get_coordinates(points_gdf.geometry.values[order])
+    if "elevation" in points_gdf.columns:
+        elev = points_gdf["elevation"].to_numpy(dtype=np.float64)[order]
+    else:
+        elev = np.full(len(order), np.nan)
 
-            elev_diff = pt2["elevation"] - pt1["elevation"]
-            dist = pt1.geometry.distance(pt2.geometry)
-            slope = elev_diff / dist if dist != 0 else 0.0
+    # Skip segments crossing paths or with a missing elevation at either end
+    if _kernels.HAS_NUMBA and len(order) > 1:
+        slope = np.empty(len(order) - 1)
+        _kernels.segment_slope_kernel(
+            np.ascontiguousarray(coords[:, 0]), np.ascontiguousarray(coords[:, 1]),
+            elev, np.ascontiguousarray(codes, dtype=np.int64), slope,
+        )
+        keep = ~np.isnan(slope)
+    else:
+        dist = np.hypot(*(coords[1:] - coords[:-1]).T)
+        elev_diff = elev[1:] - elev[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(dist != 0, elev_diff / dist, 0.0)
+        keep = (codes[1:] == codes[:-1]) & np.isfinite(elev_diff)
+    slope = slope[keep]
+    ends = np.stack([coords[:-1], coords[1:]], axis=1)[keep]
 
-            segment = LineString([pt1.geometry, pt2.geometry])
-            segments.append(segment)
-            slopes.append(round(slope, 4))
-            compliance.append(abs(slope) <= ADA_RUNNING_SLOPE_THRESHOLD)
-            group_ids.append(group_id)
+    # Classify on the exact slope, then round the (already private) array in place
+    compliant = np.abs(slope) <= ADA_RUNNING_SLOPE_THRESHOLD
+    np.round(slope, 4, out=slope)
 
     return gpd.GeoDataFrame(
         {
-            "path_id": group_ids,
-            "slope": slopes,
-            "ada_compliant": compliance,
-            "geometry": segments,
+            "path_id": path_ids[codes[:-1][keep]],
+            "slope": slope,
+            "ada_compliant": compliant,
+            "geometry": segment_lines(ends),
         },
         crs=points_gdf.crs,
     )
 
 
+def path_order(points_gdf: gpd.GeoDataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Order points by path_id, keeping index order within each path.
+
+    Args:
+        points_gdf: GeoDataFrame of path points, optionally with a "path_id" column.
+
+    Returns:
+        Tuple of (order, codes, path_ids): positional order of the rows, the path code
+        of each row in that order, and the path_id value for each code. Without a
+        "path_id" column all points belong to a single path with id None.
+    """
+    n = len(points_gdf)
+    index = points_gdf.index
+    if index.is_monotonic_increasing:
+        index_order = np.arange(n)
+    else:
+        index_order = index.argsort(kind="stable")
+
+    if "path_id" not in points_gdf.columns:
+        # A single path: index order is all there is to sort by
+        return index_order, np.zeros(n, dtype=np.int64), np.array([None], dtype=object)
+
+    codes, path_ids = pd.factorize(points_gdf["path_id"], sort=True)
+    index_rank = np.empty(n, dtype=np.int64)
+    index_rank[index_order] = np.arange(n)
+    order = np.lexsort((index_rank, codes))
+    return order, codes[order], np.asarray(path_ids)
+
+
+def segment_lines(ends: np.ndarray, max_workers: Optional[int] = None) -> np.ndarray:
+    """Create two-point LineStrings from an ``(N, 2, 2)`` array of segment end points.
+
+    Shapely releases the GIL while building geometries, so large inputs are split
+    into chunks that are built on a thread pool.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(ends) < PARALLEL_MIN_SEGMENTS:
+        return shapely.linestrings(ends)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(shapely.linestrings, np.array_split(ends, workers))))
+
+
+def compute_window_slopes(
+    x: np.ndarray,
+    y: np.ndarray,
+    elev: np.ndarray,
+    half_window: int,
+    threshold: float = ADA_RUNNING_SLOPE_THRESHOLD,
+    groups: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute slopes across centred windows of consecutive points along paths.
+
+    The slope at point ``i`` is the rise over the straight-line distance between
+    points ``i - half_window`` and ``i + half_window``.
+
+    Args:
+        x, y: Point coordinates in a metric CRS
+        elev: Elevations (NaN where missing)
+        half_window: Number of points on each side of the window centre
+        threshold: Maximum compliant slope as rise/run
+        groups: Path code per point, with each path stored contiguously (see
+            :func:`path_order`). Defaults to a single path.
+
+    Returns:
+        Tuple of (slope, compliant) arrays with one entry per point. Points without
+        a full window on their own path, or whose window contains a missing
+        elevation, are NaN/False.
+
+    Raises:
+        ValueError: If x, y, elev and groups differ in length
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    elev = np.ascontiguousarray(elev, dtype=np.float64)
+    n = len(elev)
+    if groups is None:
+        groups = np.zeros(n, dtype=np.int64)
+    groups = np.ascontiguousarray(groups, dtype=np.int64)
+    # The kernel indexes all four arrays by point without bounds checks
+    if not len(x) == len(y) == n == len(groups):
+        raise ValueError(
+            f"x, y, elev and groups must have the same length, got "
+            f"{len(x)}, {len(y)}, {n} and {len(groups)}"
+        )
+    slope = np.full(n, np.nan)
+    compliant = np.zeros(n, dtype=bool)
+    if n < 2 * half_window + 1:
+        return slope, compliant
+
+    if _kernels.HAS_NUMBA:
+        _kernels.slope_kernel(x, y, elev, groups, half_window, threshold, slope, compliant)
+        return slope, compliant
+
+    start = np.arange(n - 2 * half_window)
+    end = start + 2 * half_window
+    dist = np.hypot(x[end] - x[start], y[end] - y[start])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        window_slope = np.where(dist != 0, (elev[end] - elev[start]) / dist, 0.0)
+
+    # Count missing elevations per window with a running sum
+    missing = np.concatenate(([0], np.cumsum(np.isnan(elev))))
+    window_slope[missing[end + 1] - missing[start] > 0] = np.nan
+    window_slope[groups[end] != groups[start]] = np.nan
+
+    slope[start + half_window] = window_slope
+    compliant = np.abs(slope) <= threshold
+    return slope, compliant
+
+
 def compute_running_slope(
     dem: np.ndarray, 
     resx: float, 
     resy: float, 
-    nodata: Optional[float] = None
+    nodata: Optional[float] = None,
+    dtype: DTypeLike = np.float32,
 ) -> np.ndarray:
     """Compute running slope from DEM using numpy gradient with pixel spacing.
     
@@ -102,12 +243,15 @@ def compute_running_slope(
         resx: Pixel size in X direction (meters)
         resy: Pixel size in Y direction (meters)  
         nodata: Nodata value to mask (will be converted to NaN)
+        dtype: Floating point type of the working buffers and result
     
     Returns:
         2D array of slope magnitudes in percentage
     """
     # Mask nodata values
-    masked_dem = mask_nodata(dem, nodata)
+    masked_dem = _masked_input(dem, nodata, dtype)
+    if _use_grid_kernel(masked_dem):
+        return _slope_grid(masked_dem, resx, resy, 0)
     
     # Compute gradients with proper pixel spacing
     gy, gx = np.gradient(masked_dem, resy, resx)
@@ -123,7 +267,8 @@ def compute_cross_slope(
     resx: float, 
     resy: float,
     assumed_path_axis: str = "x",
-    nodata: Optional[float] = None
+    nodata: Optional[float] = None,
+    dtype: DTypeLike = np.float32,
 ) -> np.ndarray:
     """Compute cross-slope (perpendicular to assumed path direction).
     
@@ -133,12 +278,15 @@ def compute_cross_slope(
         resy: Pixel size in Y direction (meters)
         assumed_path_axis: Direction of path ("x" or "y")
         nodata: Nodata value to mask
+        dtype: Floating point type of the working buffers and result
     
     Returns:
         2D array of cross-slope values in percentage
     """
     # Mask nodata values
-    masked_dem = mask_nodata(dem, nodata)
+    masked_dem = _masked_input(dem, nodata, dtype)
+    if _use_grid_kernel(masked_dem):
+        return _slope_grid(masked_dem, resx, resy, 1 if assumed_path_axis.lower() == "x" else 2)
     
     # Compute gradients with proper pixel spacing
     gy, gx = np.gradient(masked_dem, resy, resx)
@@ -152,23 +300,99 @@ def compute_cross_slope(
     return cross_slope
 
 
-def mask_nodata(arr: np.ndarray, nodata: Optional[float] = None) -> np.ndarray:
+def compute_slopes(
+    dem: np.ndarray,
+    resx: float,
+    resy: float,
+    assumed_path_axis: str = "x",
+    nodata: Optional[float] = None,
+    dtype: DTypeLike = np.float32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute running slope and cross-slope together.
+
+    Equivalent to calling :func:`compute_running_slope` and :func:`compute_cross_slope`,
+    but the DEM is masked and differentiated once.
+
+    Args:
+        dem: 2D elevation array
+        resx: Pixel size in X direction (meters)
+        resy: Pixel size in Y direction (meters)
+        assumed_path_axis: Direction of path ("x" or "y")
+        nodata: Nodata value to mask
+        dtype: Floating point type of the working buffers and results
+
+    Returns:
+        Tuple of (running_slope, cross_slope) arrays in percentage
+    """
+    masked_dem = _masked_input(dem, nodata, dtype)
+    cross_is_gy = assumed_path_axis.lower() == "x"
+    if _use_grid_kernel(masked_dem):
+        running_slope = np.empty_like(masked_dem)
+        cross_slope = np.empty_like(masked_dem)
+        _kernels.slopes_kernel(
+            masked_dem, float(resx), float(resy), cross_is_gy, running_slope, cross_slope
+        )
+        return running_slope, cross_slope
+
+    gy, gx = np.gradient(masked_dem, resy, resx)
+    running_slope = np.sqrt(gx**2 + gy**2) * 100.0
+    cross_slope = np.abs(gy if cross_is_gy else gx) * 100.0
+    return running_slope, cross_slope
+
+
+def _use_grid_kernel(masked_dem: np.ndarray) -> bool:
+    # np.gradient needs two samples per axis; let it raise its usual error otherwise
+    return _kernels.HAS_NUMBA and masked_dem.ndim == 2 and min(masked_dem.shape) >= 2
+
+
+def _slope_grid(masked_dem: np.ndarray, resx: float, resy: float, component: int) -> np.ndarray:
+    """Slope raster from the fused Numba stencil, matching the np.gradient path."""
+    out = np.empty_like(masked_dem)
+    _kernels.slope_grid_kernel(masked_dem, float(resx), float(resy), component, out)
+    return out
+
+
+def mask_nodata(
+    arr: np.ndarray,
+    nodata: Optional[float] = None,
+    dtype: DTypeLike = np.float32,
+    copy: bool = True,
+) -> np.ndarray:
     """Apply robust nodata masking using np.isfinite.
     
     Args:
         arr: Input array
         nodata: Specific nodata value to mask to NaN
+        dtype: Floating point type of the returned array (float32 by default,
+            which DEM GeoTIFFs are stored in)
+        copy: If False and ``arr`` already has ``dtype``, mask it in place
         
     Returns:
         Array with nodata values set to NaN and non-finite values masked
     """
-    masked = arr.copy().astype(np.float64)
+    masked = np.array(arr, dtype=dtype) if copy else np.asarray(arr, dtype=dtype)
     
     # Set specific nodata value to NaN
     if nodata is not None:
-        masked[arr == nodata] = np.nan
+        np.putmask(masked, arr == nodata, np.nan)
         
     # Mask any remaining non-finite values
-    masked[~np.isfinite(masked)] = np.nan
+    np.putmask(masked, ~np.isfinite(masked), np.nan)
     
     return masked
+
+
+def _masked_input(dem: np.ndarray, nodata: Optional[float], dtype: DTypeLike) -> np.ndarray:
+    """Return ``mask_nodata(dem)``, reusing ``dem`` itself when nothing needs masking.
+
+    The slope functions only read the masked DEM, so a clean input of the right
+    dtype does not need a copy.
+    """
+    dem = np.asarray(dem)
+    if (
+        dem.dtype == dtype
+        and np.isfinite(dem).all()
+        and (nodata is None or not (dem == nodata).any())
+    ):
+        return dem
+    return mask_nodata(dem, nodata, dtype)
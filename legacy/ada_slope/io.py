@@ -1,24 +1,42 @@
 """I/O utilities: raster/vector helpers, CRS alignment and validation."""
 from __future__ import annotations
 
-from typing import Optional, Tuple
+import functools
+from typing import Iterator, Optional, Sequence, Tuple
 
 import geopandas as gpd
 import numpy as np
+import pandas as pd
+import pyproj
 import rasterio
+import shapely
 from rasterio.io import DatasetReader, MemoryFile
+from rasterio.windows import Window
 import logging
 
+from ._raster_cache import get_dataset
+
+try:  # pyogrio writes and reads vector files much faster than fiona
+    import pyogrio
+    VECTOR_ENGINE: Optional[str] = "pyogrio"
+except ImportError:
+    VECTOR_ENGINE = None  # geopandas' default engine
+
 logger = logging.getLogger(__name__)
 
+# Largest bounding window _sample_band reads in one go
+MAX_WINDOW_PIXELS = 4096 * 4096
+
+# Metric CRS used for distance-based calculations when the input is not metric
+METRIC_CRS = "EPSG:26917"
+
 
 def ensure_vector_matches_raster_crs(vector_gdf: gpd.GeoDataFrame, raster_path: str) -> gpd.GeoDataFrame:
     """Return a GeoDataFrame reprojected to the raster CRS if needed.
 
     Raises on IO errors. Does not mutate the input in-place.
     """
-    with rasterio.open(raster_path) as src:
-        raster_crs = src.crs
+    raster_crs = _raster_crs(get_dataset(raster_path))
 
     if vector_gdf.crs is None:
         raise ValueError("Input vector has no CRS")
@@ -33,6 +51,89 @@ def ensure_vector_matches_raster_crs(vector_gdf: gpd.GeoDataFrame, raster_path:
     return vector_gdf
 
 
+def ensure_projected(gdf: gpd.GeoDataFrame, target: str = METRIC_CRS) -> gpd.GeoDataFrame:
+    """Return ``gdf`` reprojected to ``target`` if its CRS is geographic, else ``gdf`` itself.
+
+    Layers of non-empty Points go through the cached, vectorized transformer.
+    """
+    if gdf.crs is None:
+        raise ValueError("Input GeoDataFrame must have a CRS")
+    if not gdf.crs.is_geographic:
+        return gdf
+
+    geoms = gdf.geometry.values
+    is_point = (shapely.get_type_id(geoms) == shapely.GeometryType.POINT) & ~shapely.is_empty(geoms)
+    if is_point.all():
+        return _points_to_crs(gdf, _pyproj_crs(target))
+    return gdf.to_crs(_pyproj_crs(target))
+
+
+def read_geodata(path: str) -> gpd.GeoDataFrame:
+    """Read a vector file, using GeoParquet for ``.parquet`` paths and OGR otherwise."""
+    if str(path).lower().endswith(".parquet"):
+        return gpd.read_parquet(path)
+    return gpd.read_file(path, engine=VECTOR_ENGINE)
+
+
+def read_attributes(path: str, columns: Sequence[str]) -> pd.DataFrame:
+    """Read only the attribute ``columns`` of a vector file, skipping geometries.
+
+    Geometry parsing dominates reading large GeoJSON files, so summaries that
+    only need a few columns should use this instead of ``read_geodata``.
+    """
+    columns = list(columns)
+    if str(path).lower().endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if VECTOR_ENGINE == "pyogrio":
+        return pyogrio.read_dataframe(path, columns=columns, read_geometry=False)
+    return pd.DataFrame(gpd.read_file(path, ignore_geometry=True)[columns])
+
+
+def iter_attributes(path: str, columns: Sequence[str], batch_size: int = 65536) -> Iterator[pd.DataFrame]:
+    """Yield the attribute ``columns`` of a vector file in batches of ``batch_size`` rows.
+
+    Streams Arrow record batches (Parquet row groups, or OGR via pyogrio) so
+    memory stays bounded by one batch for files larger than RAM. Without
+    pyarrow the whole selection is yielded at once via ``read_attributes``.
+    """
+    columns = list(columns)
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        yield read_attributes(path, columns)
+        return
+    if str(path).lower().endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    elif VECTOR_ENGINE == "pyogrio":
+        with pyogrio.open_arrow(
+            path, columns=columns, read_geometry=False, batch_size=batch_size, use_pyarrow=True
+        ) as (_, reader):
+            for batch in reader:
+                yield batch.to_pandas()
+    else:
+        yield read_attributes(path, columns)
+
+
+def write_geodata(gdf: gpd.GeoDataFrame, path: str) -> None:
+    """Write a vector file: zstd GeoParquet for ``.parquet``, FlatGeobuf for ``.fgb``,
+    GeoPackage for ``.gpkg``, GeoJSON otherwise.
+
+    GeoParquet stores geometries as WKB and is much faster to write and read back
+    than GeoJSON text, so it suits intermediate pipeline files. Requires pyarrow.
+    """
+    suffix = str(path).lower()
+    if suffix.endswith(".parquet"):
+        gdf.to_parquet(path, compression="zstd")
+    elif suffix.endswith(".fgb"):
+        # no spatial index, which would reorder the features on disk
+        gdf.to_file(path, driver="FlatGeobuf", engine=VECTOR_ENGINE, SPATIAL_INDEX="NO")
+    elif suffix.endswith(".gpkg"):
+        gdf.to_file(path, driver="GPKG", engine=VECTOR_ENGINE)
+    else:
+        gdf.to_file(path, driver="GeoJSON", engine=VECTOR_ENGINE)
+
+
 def open_raster(path: str) -> DatasetReader:
     """Open a raster and perform a quick sanity check.
 
@@ -50,29 +151,127 @@ def sample_elevation_at_points(points_gdf: gpd.GeoDataFrame, dem_path: str) -> g
 
     This mirrors the previous `processing_utils.sample_elevation_at_points` behavior.
     """
-    with rasterio.open(dem_path) as src:
-        # Reproject to match raster CRS
-        if points_gdf.crs != src.crs:
-            points_gdf = points_gdf.to_crs(src.crs)
+    points_gdf = sample_points_in_raster_crs(points_gdf, dem_path)
 
-        # Only keep Point geometries
-        points_gdf = points_gdf[points_gdf.geometry.type == "Point"].copy()
+    # Reproject sampled points to a metric CRS for distance-based calculations
+    if not _is_metric(points_gdf.crs):
+        points_gdf = _points_to_crs(points_gdf, _pyproj_crs(METRIC_CRS))
 
-        # Sample elevation values
-        coords = [(geom.x, geom.y) for geom in points_gdf.geometry]
-        elevations = list(src.sample(coords))
-        nodata = src.nodata or -9999
-        points_gdf["elevation"] = [val[0] if val and val[0] != nodata else None for val in elevations]
+    return points_gdf
 
-    # Reproject sampled points to a metric CRS for distance-based calculations
+
+def sample_points_in_raster_crs(points_gdf: gpd.GeoDataFrame, dem_path: str) -> gpd.GeoDataFrame:
+    """Return the non-empty Points of ``points_gdf`` in the DEM's CRS with an ``elevation`` column.
+
+    NoData pixels and points outside the raster get NaN.
+    """
+    src = get_dataset(dem_path)
     if points_gdf.crs is None:
         raise ValueError("Input GeoDataFrame must have a CRS")
-    if points_gdf.crs.is_geographic:
-        points_gdf = points_gdf.to_crs("EPSG:26917")
 
+    # Only keep Point geometries
+    geoms = points_gdf.geometry.values
+    is_point = (shapely.get_type_id(geoms) == shapely.GeometryType.POINT) & ~shapely.is_empty(geoms)
+    points_gdf = points_gdf[is_point].copy()
+
+    # Reproject to match raster CRS
+    raster_crs = _raster_crs(src)
+    if points_gdf.crs != raster_crs:
+        points_gdf = _points_to_crs(points_gdf, raster_crs)
+
+    # Sample elevation values
+    coords = shapely.get_coordinates(points_gdf.geometry.values)
+    points_gdf["elevation"] = _sample_band(src, coords[:, 0], coords[:, 1])
     return points_gdf
 
 
+def _points_to_crs(points_gdf: gpd.GeoDataFrame, crs: Optional[pyproj.CRS]) -> gpd.GeoDataFrame:
+    """Reproject non-empty Point geometries with a cached, vectorized Transformer.
+
+    GeoPandas' ``to_crs`` builds a new pyproj Transformer on every call, which costs
+    more than transforming a few thousand points.
+    """
+    if crs is None:
+        raise ValueError("Cannot reproject points to a raster without a CRS")
+    coords = shapely.get_coordinates(points_gdf.geometry.values)
+    xs, ys = _transformer(points_gdf.crs, crs).transform(coords[:, 0], coords[:, 1])
+    geometry = gpd.GeoSeries(shapely.points(xs, ys), index=points_gdf.index, crs=crs)
+    return points_gdf.set_geometry(geometry)
+
+
+@functools.lru_cache(maxsize=32)
+def _transformer(src_crs: pyproj.CRS, dst_crs: pyproj.CRS) -> pyproj.Transformer:
+    return pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _pyproj_crs(crs: str) -> pyproj.CRS:
+    return pyproj.CRS.from_user_input(crs)
+
+
+def _raster_crs(src: DatasetReader) -> Optional[pyproj.CRS]:
+    """Return the raster CRS as a pyproj CRS.
+
+    Comparing a GeoPandas CRS with a rasterio CRS converts the latter on every
+    comparison; two pyproj CRSs compare in about a microsecond.
+    """
+    return _pyproj_crs(src.crs.to_wkt()) if src.crs else None
+
+
+def _is_metric(crs: pyproj.CRS) -> bool:
+    """True for projected CRSs whose horizontal axes are in metres."""
+    if not crs.is_projected:
+        return False
+    return all(axis.unit_name in ("metre", "meter") for axis in crs.axis_info[:2])
+
+
+def _sample_band(src: DatasetReader, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Return nearest-pixel band 1 values at the given coordinates.
+
+    Reads a single window covering all points instead of one tiny read per point,
+    unless that window would exceed ``MAX_WINDOW_PIXELS``. Points outside the raster
+    and nodata pixels are returned as NaN.
+    """
+    values = np.full(len(xs), np.nan)
+    if len(xs) == 0:
+        return values
+
+    # Pixel of every point straight from the inverse affine, as rowcol computes it
+    # but without its per-call Python overhead
+    inv = ~src.transform
+    cols = np.floor(inv.a * xs + inv.b * ys + inv.c).astype(np.int64)
+    rows = np.floor(inv.d * xs + inv.e * ys + inv.f).astype(np.int64)
+    inside = (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+    if not inside.any():
+        return values
+
+    rows, cols = rows[inside], cols[inside]
+    row0, col0 = rows.min(), cols.min()
+    window = Window(col0, row0, cols.max() - col0 + 1, rows.max() - row0 + 1)
+    if window.width * window.height <= MAX_WINDOW_PIXELS:
+        arr = src.read(1, window=window)
+        values[inside] = arr[rows - row0, cols - col0]
+    else:
+        # Points too spread out for one read: bucket them by the file's native
+        # blocks (grown to at least 256 pixels a side, so strip-organised files
+        # aren't read one row at a time) and read only the occupied blocks
+        by, bx = src.block_shapes[0]
+        by, bx = by * -(-256 // by), bx * -(-256 // bx)
+        block = (rows // by) * (src.width // bx + 1) + cols // bx
+        order = np.argsort(block, kind="stable")
+        sampled = np.empty(len(rows))
+        for group in np.split(order, np.flatnonzero(np.diff(block[order])) + 1):
+            r, c = rows[group], cols[group]
+            row0, col0 = r.min(), c.min()
+            arr = src.read(1, window=Window(col0, row0, c.max() - col0 + 1, r.max() - row0 + 1))
+            sampled[group] = arr[r - row0, c - col0]
+        values[inside] = sampled
+
+    nodata = src.nodata if src.nodata is not None else -9999
+    values[values == nodata] = np.nan
+    return values
+
+
 def load_dem_from_bytes(data: bytes) -> Tuple[np.ndarray, float, float, Optional[float]]:
     """Load DEM from bytes using MemoryFile for in-memory processing.
     
@@ -91,7 +290,7 @@ def load_dem_from_bytes(data: bytes) -> Tuple[np.ndarray, float, float, Optional
                 raise ValueError("Raster has no bands")
                 
             # Read elevation data
-            elevation = src.read(1).astype(np.float64)
+            elevation = src.read(1, out_dtype=np.float32)
             
             # Get pixel spacing (assuming square pixels for simplicity)
             transform = src.transform
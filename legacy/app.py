@@ -1,7 +1,8 @@
 import streamlit as st
+import numpy as np
 import geopandas as gpd
 import rasterio
-from shapely.geometry import Point, LineString
+import shapely
 import matplotlib.pyplot as plt
 from tempfile import NamedTemporaryFile
 try:
@@ -40,54 +41,45 @@ def compute_smoothed_slopes(points_gdf, window_size=3, slope_threshold=None):
 
     if points_gdf.crs is None:
         raise ValueError("Points must have a CRS")
-    if points_gdf.crs.is_geographic:
-        points_gdf = points_gdf.to_crs("EPSG:26917")
+    points_gdf = aio.ensure_projected(points_gdf)
 
     half_window = window_size // 2
+    # Filter rows with one mask; empty points have no coordinates and would shift
+    # every following point out of line with its elevation
+    geoms = points_gdf.geometry.values
+    usable = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    usable &= shapely.get_type_id(geoms) == shapely.GeometryType.POINT
     if "path_id" in points_gdf.columns:
-        points_gdf = points_gdf.dropna(subset=["path_id"])
-        grouped = points_gdf.groupby("path_id")
-    else:
-        grouped = [(None, points_gdf)]
-
-    segments = []
-    slopes = []
-    compliance = []
-    group_ids = []
-
-    for group_id, group in grouped:
-        group = group.loc[group.geometry.apply(lambda p: isinstance(p, Point))]
-        group = group.sort_index().reset_index(drop=True)
-
-        if len(group) < window_size:
-            continue
-
-        for i in range(half_window, len(group) - half_window):
-            window = group.iloc[i - half_window : i + half_window + 1]
-            if window["elevation"].isnull().any():
-                continue
-
-            pt1, pt2 = window.iloc[0], window.iloc[-1]
-            elev_diff = pt2["elevation"] - pt1["elevation"]
-            dist = pt1.geometry.distance(pt2.geometry)
-            slope = elev_diff / dist if dist != 0 else 0
-
-            segment = LineString([pt1.geometry, pt2.geometry])
-            segments.append(segment)
-            slopes.append(round(slope, 4))
-            if slope_threshold is None:
-                st_threshold = core.ADA_RUNNING_SLOPE_THRESHOLD
-            else:
-                st_threshold = slope_threshold
-            compliance.append(abs(slope) <= st_threshold)
-            group_ids.append(group_id)
+        usable &= points_gdf["path_id"].notna().to_numpy()
+    if not usable.all():
+        points_gdf = points_gdf[usable]
+
+    if slope_threshold is None:
+        slope_threshold = core.ADA_RUNNING_SLOPE_THRESHOLD
+
+    # One global pass over all paths; windows never span two paths
+    order, codes, path_ids = core.path_order(points_gdf)
+    coords = shapely.get_coordinates(points_gdf.geometry.values[order])
+    slope, compliant = core.compute_window_slopes(
+        coords[:, 0],
+        coords[:, 1],
+        points_gdf["elevation"].to_numpy(dtype=float)[order],
+        half_window,
+        slope_threshold,
+        groups=codes,
+    )
+    centres = np.flatnonzero(~np.isnan(slope))
+    slope = slope[centres]
+    np.round(slope, 4, out=slope)
 
     return gpd.GeoDataFrame(
         {
-            "path_id": group_ids,
-            "slope": slopes,
-            "ada_compliant": compliance,
-            "geometry": segments,
+            "path_id": path_ids[codes[centres]],
+            "slope": slope,
+            "ada_compliant": compliant[centres],
+            "geometry": core.segment_lines(
+                np.stack([coords[centres - half_window], coords[centres + half_window]], axis=1)
+            ),
         },
         crs=points_gdf.crs,
     )
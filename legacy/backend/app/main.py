@@ -1,16 +1,80 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
 import uuid
-from typing import Any
+from collections import OrderedDict
+from typing import Any, BinaryIO, Optional
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
+
+try:  # orjson is optional; it serializes the summary and histogram lists faster
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 from pydantic import BaseModel
 
-from .processing import process_dem_in_memory
+from ada_slope import _kernels
+
+from .processing import process_dem_from_path
 
 
 MAX_UPLOAD_BYTES = 25 * 1024 * 1024  # 25 MiB
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_JOBS = int(os.getenv("JOBS_MAX", "1024"))  # results kept per warm container
+JOBS_TTL = float(os.getenv("JOBS_TTL", "3600"))  # seconds an unread job is kept
+MAX_CACHED_RESULTS = 128  # distinct (DEM, parameters) results reused across uploads
+
+# DEMs are processed on worker threads, where numba's TBB layer hangs at process exit
+_kernels.prefer_omp_threading()
+
+
+class JobStore:
+    """Bounded in-memory results by key; the least recently used entry is dropped first.
+
+    With a ``ttl`` (seconds), entries that have not been stored or read for that long
+    expire as well.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (last use, value), ordered from least to most recently used
+        self._jobs: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, job_id: str, job: dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job_id] = (time.monotonic(), job)
+            self._jobs.move_to_end(job_id)
+            self._evict()
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            self._evict()
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            self._jobs[job_id] = (time.monotonic(), entry[1])
+            self._jobs.move_to_end(job_id)
+            return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _evict(self) -> None:
+        while len(self._jobs) > self.maxsize:
+            self._jobs.popitem(last=False)
+        if self.ttl is not None:
+            cutoff = time.monotonic() - self.ttl
+            while self._jobs and next(iter(self._jobs.values()))[0] < cutoff:
+                self._jobs.popitem(last=False)
 
 
 class Results(BaseModel):
@@ -19,8 +83,31 @@ class Results(BaseModel):
     artifacts: dict[str, Any]
 
 
+async def read_upload(file: UploadFile, dest: BinaryIO) -> str:
+    """Copy an upload to *dest* in chunks and return its SHA-256 hex digest.
+
+    Fails with 413 as soon as the upload exceeds MAX_UPLOAD_BYTES.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="ERR_SIZE_LIMIT")
+
+    digest, total = hashlib.sha256(), 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="ERR_SIZE_LIMIT")
+        digest.update(chunk)
+        dest.write(chunk)
+    dest.flush()
+    return digest.hexdigest()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="ADA Slope Compliance API", version="0.2.0")
+    app = FastAPI(
+        title="ADA Slope Compliance API",
+        version="0.2.0",
+        default_response_class=FastJSONResponse,
+    )
 
     # CORS will be tightened in API Gateway; allow narrow origin here if set
     allowed_origin = os.getenv("CORS_ORIGIN")
@@ -34,7 +121,9 @@ def create_app() -> FastAPI:
             max_age=600,
         )
 
-    JOBS: dict[str, dict[str, Any]] = {}
+    JOBS = JobStore(MAX_JOBS, ttl=JOBS_TTL)
+    # Results keyed by DEM content hash and parameters, so a repeat upload is free
+    RESULTS = JobStore(MAX_CACHED_RESULTS)
 
     @app.get("/healthz")
     def healthz():
@@ -54,25 +143,32 @@ def create_app() -> FastAPI:
         if not file.filename.lower().endswith((".tif", ".tiff")):
             raise HTTPException(status_code=400, detail="ERR_BAD_MIME")
 
-        data = await file.read()
-        if len(data) > MAX_UPLOAD_BYTES:
-            raise HTTPException(status_code=413, detail="ERR_SIZE_LIMIT")
-
-        job_id = str(uuid.uuid4())
-        try:
-            result = process_dem_in_memory(
-                data,
-                running_slope_max=running_slope_max,
-                cross_slope_max=cross_slope_max,
-                assumed_path_axis=assumed_path_axis,
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail="ERR_TIFF_READ") from e
-        JOBS[job_id] = {
+        # Spool the upload to disk and let GDAL read it from there, rather than
+        # holding the encoded file in memory next to the decoded strips
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tmp:
+            sha256 = await read_upload(file, tmp)
+
+            job_id = str(uuid.uuid4())
+            cache_key = ":".join((sha256, repr(running_slope_max), repr(cross_slope_max), assumed_path_axis))
+            result = RESULTS.get(cache_key)
+            if result is None:
+                try:
+                    # Run off the event loop so other requests are served meanwhile
+                    result = await asyncio.to_thread(
+                        process_dem_from_path,
+                        tmp.name,
+                        running_slope_max=running_slope_max,
+                        cross_slope_max=cross_slope_max,
+                        assumed_path_axis=assumed_path_axis,
+                    )
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail="ERR_TIFF_READ") from e
+                RESULTS.put(cache_key, result)
+        JOBS.put(job_id, {
             "status": "done",
             "summary": result["summary"],
             "artifacts": result["artifacts"],
-        }
+        })
         return {"job_id": job_id}
 
     @app.get("/results/{job_id}", response_model=Results)
@@ -80,12 +176,10 @@ def create_app() -> FastAPI:
         job = JOBS.get(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
-        return JSONResponse(job)
+        return FastJSONResponse(job)
 
     return app
 
 
-import os
-
 app = create_app()
 handler = Mangum(app)
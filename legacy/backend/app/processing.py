@@ -1,9 +1,119 @@
 import sys
 sys.path.append("../../")  # Add parent directory to path
 
+from typing import Iterator, Tuple
+
 import numpy as np
-from ada_slope.core import compute_running_slope, compute_cross_slope
-from ada_slope.io import load_dem_from_bytes
+import rasterio
+from rasterio.io import MemoryFile
+from rasterio.windows import Window
+
+from ada_slope import _kernels
+from ada_slope.core import compute_running_slope, compute_slopes, mask_nodata
+
+# Working precision for the slope rasters. float32 resolves ~1e-5 m at typical
+# elevations, far below ADA tolerances; float16 (0.0625 m at 100 m) does not.
+SLOPE_DTYPE = np.float32
+
+# Rows per processing strip; a float32 strip of a 10k-wide DEM is ~20 MiB
+TILE_ROWS = 512
+
+# The slope histogram spans 0..max(HIST_MIN_RANGE_PCT, max slope) percent
+HIST_MIN_RANGE_PCT = 10.0
+
+
+def _iter_dem_tiles(src) -> Iterator[Tuple[np.ndarray, Tuple[slice, slice]]]:
+    """Yield ``(tile, interior)`` for full-width strips of ``TILE_ROWS`` rows of band 1.
+
+    Each strip is read with a one-row halo above and below (clipped at the raster
+    edge) so that ``np.gradient`` sees the same neighbours it would on the full
+    raster; ``interior`` slices the halo back off the computed result.
+    """
+    for r0 in range(0, src.height, TILE_ROWS):
+        r1 = min(r0 + TILE_ROWS, src.height)
+        halo0 = max(r0 - 1, 0)
+        halo1 = min(r1 + 1, src.height)
+
+        tile = src.read(1, window=Window(0, halo0, src.width, halo1 - halo0), out_dtype=SLOPE_DTYPE)
+        interior = (slice(r0 - halo0, r1 - halo0), slice(0, src.width))
+        yield tile, interior
+
+
+def _tile_stats(
+    tile, interior, resx, resy, nodata, run_limit, cross_limit, assumed_path_axis, edges, hist
+):
+    """Return ``(total, run_over, cross_over, slope_sum, slope_max)`` for a tile's interior.
+
+    The running slope histogram over ``edges`` is added to ``hist`` in the same pass.
+    """
+    if min(tile.shape) >= 2 and _is_flat(tile, nodata):
+        # Constant elevation with no nodata: every slope is 0, so skip the kernel
+        rows, cols = interior
+        total = (rows.stop - rows.start) * (cols.stop - cols.start)
+        hist[0] += total
+        return total, total if run_limit < 0 else 0, total if cross_limit < 0 else 0, 0.0, 0.0
+
+    if _kernels.HAS_NUMBA and min(tile.shape) >= 2:
+        rows, cols = interior
+        return _kernels.slope_stats_kernel(
+            mask_nodata(tile, nodata, SLOPE_DTYPE, copy=False), resx, resy,
+            rows.start, rows.stop, cols.start, cols.stop,
+            run_limit, cross_limit, assumed_path_axis.lower() == "x", edges, hist,
+        )
+
+    running_slope, cross_slope = compute_slopes(tile, resx, resy, assumed_path_axis, nodata, SLOPE_DTYPE)
+    running_slope = running_slope[interior]
+    cross_slope = cross_slope[interior]
+
+    # NaN compares False, so the threshold counts need no validity mask; the
+    # where= reductions skip NaNs without copying out the valid pixels.
+    valid = np.isfinite(running_slope)
+    total = int(np.count_nonzero(valid))
+    run_over = int(np.count_nonzero(running_slope > run_limit))
+    cross_over = int(np.count_nonzero(cross_slope > cross_limit))
+    slope_sum = float(running_slope.sum(where=valid, dtype=np.float64))
+    slope_max = float(running_slope.max(where=valid, initial=0.0))
+    hist += _histogram_counts(running_slope, edges)
+    return total, run_over, cross_over, slope_sum, slope_max
+
+
+def _is_flat(tile, nodata):
+    """True if every pixel of ``tile`` holds the same valid (non-NaN, non-nodata) value.
+
+    The first row is compared before the whole tile, so a tile with any relief
+    there is rejected after reading a single row rather than the full strip.
+    """
+    first = tile[0, 0]
+    if first != first or first == nodata:  # NaN or nodata
+        return False
+    return bool((tile[0] == first).all()) and bool((tile == first).all())
+
+
+def _tile_histogram(tile, interior, resx, resy, nodata, edges, hist):
+    """Add the running slope histogram of a tile's interior to ``hist``."""
+    if _kernels.HAS_NUMBA and min(tile.shape) >= 2:
+        rows, cols = interior
+        _kernels.slope_histogram_kernel(
+            mask_nodata(tile, nodata, SLOPE_DTYPE, copy=False), resx, resy,
+            rows.start, rows.stop, cols.start, cols.stop, edges, hist,
+        )
+        return
+
+    running_slope = compute_running_slope(tile, resx, resy, nodata, SLOPE_DTYPE)[interior]
+    hist += _histogram_counts(running_slope, edges)
+
+
+def _histogram_counts(values, edges):
+    """``np.histogram(values, edges)`` counts without a masked copy of ``values``.
+
+    Bins are found with ``searchsorted`` as np.histogram does; NaN and out-of-range
+    values go to an overflow bin that is dropped.
+    """
+    nbins = len(edges) - 1
+    idx = np.searchsorted(edges, values, side="right") - 1
+    idx[values == edges[-1]] = nbins - 1  # last bin is closed on the right
+    idx[idx < 0] = nbins
+    return np.bincount(idx.ravel(), minlength=nbins + 1)[:nbins]
 
 
 def process_dem_in_memory(
@@ -11,33 +121,81 @@ def process_dem_in_memory(
     running_slope_max: float = 0.05,
     cross_slope_max: float = 0.02083,
     assumed_path_axis: str = "x",
+):
+    """
+    Compute running and cross-slope (percent) from DEM GeoTIFF bytes and return compliance stats.
+
+    Same as :func:`process_dem_from_path`, for a DEM that is already in memory.
+    """
+    with MemoryFile(geotiff_bytes) as memfile:
+        with memfile.open() as src:
+            return _process_dataset(src, running_slope_max, cross_slope_max, assumed_path_axis)
+
+
+def process_dem_from_path(
+    path: str,
+    running_slope_max: float = 0.05,
+    cross_slope_max: float = 0.02083,
+    assumed_path_axis: str = "x",
 ):
     """
     Compute running and cross-slope (percent) from a DEM GeoTIFF and return compliance stats.
 
     running_slope_max/cross_slope_max are expressed as rise/run (e.g., 0.05 -> 5%).
+
+    The raster is processed in strips of ``TILE_ROWS`` rows so peak memory scales with
+    the strip size rather than the full DEM. With Numba installed each tile is reduced by fused
+    kernels that never materialize the gradient or slope rasters.
     """
-    # Load DEM from bytes using ada_slope functions
-    dem, resx, resy, nodata = load_dem_from_bytes(geotiff_bytes)
-    
-    # Compute slopes using ada_slope core functions
-    running_slope = compute_running_slope(dem, resx, resy, nodata)
-    cross_slope = compute_cross_slope(dem, resx, resy, assumed_path_axis, nodata)
-    
-    # Calculate compliance statistics
-    valid = np.isfinite(running_slope)
-    total = int(valid.sum())
+    with rasterio.open(path) as src:
+        return _process_dataset(src, running_slope_max, cross_slope_max, assumed_path_axis)
+
 
-    run_over = (running_slope > (running_slope_max * 100.0)) & valid
-    cross_over = (cross_slope > (cross_slope_max * 100.0)) & np.isfinite(cross_slope)
+def _process_dataset(src, running_slope_max, cross_slope_max, assumed_path_axis):
+    if src.count < 1:
+        raise ValueError("Raster has no bands")
+
+    run_limit = running_slope_max * 100.0
+    cross_limit = cross_slope_max * 100.0
+
+    total = 0
+    pixels_violating_running = 0
+    pixels_violating_cross = 0
+    slope_sum = 0.0
+    max_slope = 0.0
+
+    # Integer DEMs (e.g. int16 centimetres) carry a band scale to metres. Slope is
+    # linear in dz, so the scale is folded into the pixel spacing and tiles are
+    # processed, and nodata-masked, in their stored units
+    scale = src.scales[0] or 1.0
+    resx = abs(src.transform.a) / scale
+    resy = abs(src.transform.e) / scale
+    nodata = src.nodata
+
+    # Bin against the default histogram range while gathering the stats;
+    # only a max slope beyond it needs a second pass with wider bins.
+    edges = np.linspace(0.0, HIST_MIN_RANGE_PCT, 11)
+    hist = np.zeros(10, dtype=np.int64)
+    for tile, interior in _iter_dem_tiles(src):
+        count, run_over, cross_over, tile_sum, tile_max = _tile_stats(
+            tile, interior, resx, resy, nodata, run_limit, cross_limit,
+            assumed_path_axis, edges, hist,
+        )
+        total += count
+        pixels_violating_running += run_over
+        pixels_violating_cross += cross_over
+        slope_sum += tile_sum
+        max_slope = max(max_slope, tile_max)
+
+    if max_slope > HIST_MIN_RANGE_PCT:
+        edges = np.linspace(0.0, max_slope, 11)
+        hist[:] = 0
+        for tile, interior in _iter_dem_tiles(src):
+            _tile_histogram(tile, interior, resx, resy, nodata, edges, hist)
 
-    pixels_violating_running = int(run_over.sum())
-    pixels_violating_cross = int(cross_over.sum())
     percent_violating_running = float((pixels_violating_running / total) * 100.0) if total else 0.0
     percent_violating_cross = float((pixels_violating_cross / total) * 100.0) if total else 0.0
-
-    max_slope = float(np.nanmax(running_slope)) if total else 0.0
-    mean_slope = float(np.nanmean(running_slope)) if total else 0.0
+    mean_slope = slope_sum / total if total else 0.0
 
     summary = {
         "running_slope_threshold_pct": round(running_slope_max * 100.0, 5),
@@ -53,8 +211,6 @@ def process_dem_in_memory(
         "pass_cross": pixels_violating_cross == 0,
     }
 
-    hist_max = max(10.0, max_slope)
-    hist, _ = np.histogram(running_slope[valid], bins=10, range=(0, hist_max))
     artifacts = {"histogram": hist.astype(int).tolist()}
 
     return {"summary": summary, "artifacts": artifacts}
@@ -1,21 +1,64 @@
+import hashlib
+import os
+import sys
+
 import numpy as np
 import pytest
-from typing import Tuple
+from typing import Dict, Tuple
 
 rasterio = pytest.importorskip("rasterio")
 from rasterio.io import MemoryFile
 from rasterio.transform import from_origin
 
+# Encoded GeoTIFFs by (content digest, shape, res, nodata, block_size, dtype); the
+# same fixture arrays are encoded by many tests
+_GEOTIFF_CACHE: Dict[tuple, bytes] = {}
+
+# Block side for fixtures large enough to tile, matching typical production DEMs
+DEFAULT_BLOCK_SIZE = 256
+
+# Band scale (metres per stored unit) of integer fixtures: centimetres
+INT_SCALE = 0.01
+
 
 def geotiff_bytes_from_array(
-    arr: np.ndarray, res: Tuple[float, float] = (1.0, 1.0), nodata: float | None = None
+    arr: np.ndarray,
+    res: Tuple[float, float] = (1.0, 1.0),
+    nodata: float | None = None,
+    block_size: int | None = None,
+    dtype: str = "float32",
 ) -> bytes:
-    """Write a 2D array to an in-memory GeoTIFF and return bytes."""
+    """Write a 2D array to an in-memory GeoTIFF and return bytes.
+
+    Arrays at least ``DEFAULT_BLOCK_SIZE`` pixels on each side are tiled in blocks
+    of that size, so windowed reads touch the same blocks as on real DEMs; smaller
+    ones are written in strips. Pass ``block_size`` (a multiple of 16) to choose
+    the tiling. An integer ``dtype`` stores elevations in centimetres with a band
+    scale of ``INT_SCALE``; pixels equal to ``nodata`` keep that value. Results are
+    memoized on the array contents, so repeated encodes return cached bytes.
+    """
+    arr = np.ascontiguousarray(arr, dtype="float32")
+    if block_size is None and min(arr.shape) >= DEFAULT_BLOCK_SIZE:
+        block_size = DEFAULT_BLOCK_SIZE
+    digest = hashlib.blake2b(arr.tobytes(), digest_size=16).digest()
+    key = (digest, arr.shape, tuple(res), nodata, block_size, dtype)
+    if key not in _GEOTIFF_CACHE:
+        _GEOTIFF_CACHE[key] = _encode_geotiff(arr, res, nodata, block_size, dtype)
+    return _GEOTIFF_CACHE[key]
+
+
+def _encode_geotiff(arr: np.ndarray, res, nodata, block_size, dtype) -> bytes:
     h, w = arr.shape
+    scaled = np.issubdtype(np.dtype(dtype), np.integer)
+    if scaled:
+        stored = np.round(arr / INT_SCALE)
+        if nodata is not None:
+            stored[arr == nodata] = nodata
+        arr = stored.astype(dtype)
     transform = from_origin(0, 0, res[0], res[1])
     profile = {
         "driver": "GTiff",
-        "dtype": "float32",
+        "dtype": dtype,
         "width": w,
         "height": h,
         "count": 1,
@@ -23,13 +66,26 @@ def geotiff_bytes_from_array(
         "transform": transform,
         "nodata": nodata,
     }
-    arr = arr.astype("float32")
+    if block_size:
+        profile.update(tiled=True, blockxsize=block_size, blockysize=block_size)
     with MemoryFile() as mem:
         with mem.open(**profile) as dst:
             dst.write(arr, 1)
+            if scaled:
+                dst.scales = (INT_SCALE,)
         return mem.read()
 
 
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the backend app, shared by every API test."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
 @pytest.fixture
 def flat_dem() -> np.ndarray:
     """Create a flat DEM (0% slope everywhere)."""
@@ -40,24 +96,20 @@ def flat_dem() -> np.ndarray:
 def gentle_slope_dem() -> np.ndarray:
     """Create a DEM with 3% slope (ADA compliant)."""
     # 3% slope = 0.03 rise/run
-    x = np.arange(10)
-    y = np.arange(10)
-    xx, yy = np.meshgrid(x, y)
     # Slope in x direction: 3% = 3m rise per 100m run
     # With 1m pixels: 0.03m rise per 1m run
-    return (xx * 0.03 + 100.0).astype(np.float32)
+    row = (np.arange(10) * 0.03 + 100.0).astype(np.float32)
+    return np.broadcast_to(row, (10, 10))  # read-only view; encoding copies it once
 
 
 @pytest.fixture
 def steep_slope_dem() -> np.ndarray:
     """Create a DEM with 8% slope (ADA non-compliant)."""
     # 8% slope = 0.08 rise/run
-    x = np.arange(10)
-    y = np.arange(10)
-    xx, yy = np.meshgrid(x, y)
     # Slope in x direction: 8% = 8m rise per 100m run
     # With 1m pixels: 0.08m rise per 1m run
-    return (xx * 0.08 + 100.0).astype(np.float32)
+    row = (np.arange(10) * 0.08 + 100.0).astype(np.float32)
+    return np.broadcast_to(row, (10, 10))  # read-only view; encoding copies it once
 
 
 @pytest.fixture
@@ -10,13 +10,11 @@ backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend
 sys.path.insert(0, backend_path)
 
 rasterio = pytest.importorskip("rasterio")
-from fastapi.testclient import TestClient
-from app.main import app
+from app.main import JobStore
 from conftest import geotiff_bytes_from_array
 
-client = TestClient(app)
 
-def test_upload_and_results():
+def test_upload_and_results(client):
     arr = np.zeros((20, 20), dtype="float32")
     data = geotiff_bytes_from_array(arr)
     files = {"file": ("dem.tif", data, "image/tiff")}
@@ -31,13 +29,13 @@ def test_upload_and_results():
     assert "histogram" in js["artifacts"]
 
 
-def test_healthz():
+def test_healthz(client):
     r = client.get("/healthz")
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
 
 
-def test_bad_mime():
+def test_bad_mime(client):
     data = b"not a tiff"
     files = {"file": ("bad.txt", data, "text/plain")}
     r = client.post("/upload", files=files)
@@ -45,10 +43,88 @@ def test_bad_mime():
     assert r.json()["detail"] == "ERR_BAD_MIME"
 
 
-def test_oversize_rejected():
+def test_oversize_rejected(client):
     # 26 MiB of zeros
     data = b"\x00" * (26 * 1024 * 1024)
     files = {"file": ("dem.tif", data, "image/tiff")}
     r = client.post("/upload", files=files)
     assert r.status_code == 413
-    assert r.json()["detail"] == "ERR_SIZE_LIMIT"
\ No newline at end of file
+    assert r.json()["detail"] == "ERR_SIZE_LIMIT"
+
+def test_job_store_drops_oldest_results():
+    jobs = JobStore(maxsize=2)
+    jobs.put("a", {"status": "done"})
+    jobs.put("b", {"status": "done"})
+    assert jobs.get("a") is not None  # "a" is now the most recently used
+    jobs.put("c", {"status": "done"})
+
+    assert len(jobs) == 2
+    assert jobs.get("b") is None
+    assert jobs.get("a") is not None and jobs.get("c") is not None
+
+
+def test_repeat_upload_reuses_result(client, monkeypatch):
+    import app.main as main
+
+    calls = []
+    original = main.process_dem_from_path
+
+    def counting_process(path, **kwargs):
+        calls.append(kwargs)
+        return original(path, **kwargs)
+
+    monkeypatch.setattr(main, "process_dem_from_path", counting_process)
+
+    data = geotiff_bytes_from_array(np.arange(36, dtype="float32").reshape(6, 6))
+    files = {"file": ("dem.tif", data, "image/tiff")}
+    first = client.post("/upload", files=files)
+    second = client.post("/upload", files=files)
+    other_params = client.post("/upload?running_slope_max=0.08", files=files)
+
+    assert len(calls) == 2
+    first_result = client.get(f"/results/{first.json()['job_id']}").json()
+    second_result = client.get(f"/results/{second.json()['job_id']}").json()
+    assert first.json()["job_id"] != second.json()["job_id"]
+    assert first_result == second_result
+    assert other_params.status_code == 200
+
+
+def test_read_upload_stops_at_size_limit(monkeypatch):
+    import asyncio
+    import hashlib
+    import io
+
+    from fastapi import HTTPException, UploadFile
+    import app.main as main
+
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 10)
+    monkeypatch.setattr(main, "UPLOAD_CHUNK_BYTES", 4)
+
+    # No declared size, so the limit must be enforced while reading
+    dest = io.BytesIO()
+    digest = asyncio.run(main.read_upload(UploadFile(io.BytesIO(b"x" * 10)), dest))
+    assert dest.getvalue() == b"x" * 10
+    assert digest == hashlib.sha256(b"x" * 10).hexdigest()
+    body = io.BytesIO(b"x" * 100)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.read_upload(UploadFile(body), io.BytesIO()))
+    assert exc.value.status_code == 413
+    assert body.tell() == 12  # stopped after the chunk that crossed the limit
+
+
+def test_job_store_expires_idle_results(monkeypatch):
+    import app.main as main
+
+    now = [1000.0]
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+
+    jobs = JobStore(maxsize=10, ttl=60)
+    jobs.put("a", {"status": "done"})
+    jobs.put("b", {"status": "done"})
+    now[0] += 45
+    assert jobs.get("a") is not None  # reading "a" restarts its clock
+    now[0] += 30
+
+    assert jobs.get("b") is None
+    assert jobs.get("a") is not None
+    assert len(jobs) == 1
@@ -0,0 +1,134 @@
+"""Test DEM processing in the FastAPI backend."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+sys.path.insert(0, backend_path)
+
+rasterio = pytest.importorskip("rasterio")
+from ada_slope import _kernels
+from ada_slope.core import compute_running_slope, compute_cross_slope
+from app import processing
+from app.processing import _histogram_counts, process_dem_from_path, process_dem_in_memory
+from conftest import geotiff_bytes_from_array
+
+
+def test_flat_dem_passes(flat_dem_bytes):
+    result = process_dem_in_memory(flat_dem_bytes)
+    summary = result["summary"]
+    assert summary["pixels_total"] == 100
+    assert summary["max_slope_pct"] == 0.0
+    assert summary["pass_running"] and summary["pass_cross"]
+    assert sum(result["artifacts"]["histogram"]) == 100
+
+
+def test_steep_plane_violates(steep_slope_dem_bytes):
+    summary = process_dem_in_memory(steep_slope_dem_bytes)["summary"]
+    assert summary["pixels_violating_running"] == summary["pixels_total"]
+    assert summary["max_slope_pct"] == pytest.approx(8.0, abs=1e-3)
+    assert not summary["pass_running"]
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_tiled_matches_full_raster(monkeypatch, use_numba):
+    if use_numba and not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", use_numba)
+    monkeypatch.setattr(processing, "TILE_ROWS", 16)
+
+    rng = np.random.default_rng(0)
+    dem = (100.0 + np.cumsum(rng.normal(0, 0.05, (70, 50)), axis=1)).astype("float32")
+    dem[5:9, 30:34] = -9999.0
+
+    result = process_dem_in_memory(geotiff_bytes_from_array(dem, nodata=-9999.0, block_size=16))
+    summary = result["summary"]
+
+    full = dem.astype(np.float64)
+    running = compute_running_slope(full, 1.0, 1.0, -9999.0)
+    cross = compute_cross_slope(full, 1.0, 1.0, "x", -9999.0)
+    valid = np.isfinite(running)
+    hist, _ = np.histogram(running[valid], bins=10, range=(0, max(10.0, np.nanmax(running))))
+
+    assert summary["pixels_total"] == int(valid.sum())
+    assert summary["pixels_violating_running"] == int((running[valid] > 5.0).sum())
+    assert summary["pixels_violating_cross"] == int((cross[np.isfinite(cross)] > 2.083).sum())
+    assert summary["max_slope_pct"] == round(float(np.nanmax(running)), 3)
+    assert summary["mean_slope_pct"] == pytest.approx(float(np.nanmean(running)), abs=1e-3)
+    assert result["artifacts"]["histogram"] == hist.tolist()
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_flat_tiles_match_full_raster(monkeypatch, use_numba):
+    if use_numba and not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", use_numba)
+    monkeypatch.setattr(processing, "TILE_ROWS", 16)
+
+    # The first strips are constant and take the flat shortcut; the rest slope
+    dem = np.full((64, 20), 100.0, dtype="float32")
+    dem[40:] += np.arange(20, dtype="float32") * 0.07
+    summary = process_dem_in_memory(geotiff_bytes_from_array(dem))["summary"]
+
+    running = compute_running_slope(dem.astype(np.float64), 1.0, 1.0, None)
+    assert summary["pixels_total"] == dem.size
+    assert summary["pixels_violating_running"] == int((running > 5.0).sum())
+    assert summary["mean_slope_pct"] == pytest.approx(float(running.mean()), abs=1e-3)
+
+
+def test_path_matches_in_memory(tmp_path, steep_slope_dem_bytes):
+    dem_path = tmp_path / "dem.tif"
+    dem_path.write_bytes(steep_slope_dem_bytes)
+    assert process_dem_from_path(str(dem_path)) == process_dem_in_memory(steep_slope_dem_bytes)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_int16_centimetre_dem_matches_float32(monkeypatch, steep_slope_dem, use_numba):
+    if use_numba and not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", use_numba)
+
+    dem = steep_slope_dem.copy()
+    dem[0:2, 0:2] = -9999.0
+    # 3 m pixels keep the 2.67% slope clear of the histogram bin edges
+    as_float = process_dem_in_memory(geotiff_bytes_from_array(dem, res=(3.0, 3.0), nodata=-9999.0))
+    as_int16 = process_dem_in_memory(
+        geotiff_bytes_from_array(dem, res=(3.0, 3.0), nodata=-9999.0, dtype="int16")
+    )
+    assert as_int16 == as_float
+
+
+def test_histogram_counts_match_numpy():
+    values = np.array([[0.0, 1.0, 2.5, np.nan], [10.0, 9.99, -1.0, 11.0]], dtype="float32")
+    edges = np.linspace(0.0, 10.0, 11)
+    expected, _ = np.histogram(values[np.isfinite(values)], bins=edges)
+    assert _histogram_counts(values, edges).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("grade", [0.035, 0.2])
+def test_histogram_range_follows_max_slope(grade):
+    x = np.arange(12, dtype="float32")
+    dem = np.tile(x * grade + 100.0, (12, 1))
+
+    result = process_dem_in_memory(geotiff_bytes_from_array(dem))
+    hist = result["artifacts"]["histogram"]
+
+    # Every pixel sits at the plane's slope: bin 3 of 0..10% or the top bin of 0..20%
+    assert sum(hist) == result["summary"]["pixels_total"] == 144
+    assert hist[3 if grade < 0.1 else 9] == 144
+
+
+def test_large_fixture_is_tiled():
+    from rasterio.io import MemoryFile
+
+    dem = np.tile(np.arange(300, dtype="float32") * 0.03 + 100.0, (260, 1))
+    data = geotiff_bytes_from_array(dem)
+    with MemoryFile(data) as mem, mem.open() as src:
+        assert src.block_shapes == [(256, 256)]
+
+    summary = process_dem_in_memory(data)["summary"]
+    assert summary["pixels_total"] == dem.size
+    assert summary["pass_running"]
@@ -6,8 +6,10 @@ import pytest
 from ada_slope.core import (
     compute_running_slope,
     compute_cross_slope,
+    compute_slopes,
     mask_nodata
 )
+from ada_slope import _kernels
 from ada_slope.io import load_dem_from_bytes
 
 
@@ -82,8 +84,8 @@ def test_ada_compliance_thresholds(gentle_slope_dem_bytes, steep_slope_dem_bytes
     running_slope = compute_running_slope(elevation_data, resx, resy, nodata)
     
     # Check compliance (5% threshold)
-    compliant_pixels = np.abs(running_slope) <= 5.0  # 5% threshold
-    compliance_rate = np.sum(compliant_pixels) / np.sum(~np.isnan(running_slope))
+    valid = running_slope[~np.isnan(running_slope)]  # one nodata pass
+    compliance_rate = np.count_nonzero(np.abs(valid) <= 5.0) / valid.size  # 5% threshold
     assert compliance_rate > 0.9  # Should be mostly compliant
     
     # Test non-compliant slope (8%)
@@ -91,8 +93,8 @@ def test_ada_compliance_thresholds(gentle_slope_dem_bytes, steep_slope_dem_bytes
     running_slope = compute_running_slope(elevation_data, resx, resy, nodata)
     
     # Check compliance (5% threshold)
-    compliant_pixels = np.abs(running_slope) <= 5.0  # 5% threshold
-    compliance_rate = np.sum(compliant_pixels) / np.sum(~np.isnan(running_slope))
+    valid = running_slope[~np.isnan(running_slope)]  # one nodata pass
+    compliance_rate = np.count_nonzero(np.abs(valid) <= 5.0) / valid.size  # 5% threshold
     assert compliance_rate < 0.1  # Should be mostly non-compliant
 
 
@@ -115,3 +117,73 @@ def test_pixel_spacing_affects_slope_calculation():
     if len(valid_1m) > 0 and len(valid_2m) > 0:
         ratio = valid_2m[0] / valid_1m[0]
         assert 0.45 < ratio < 0.55  # Should be approximately 0.5
+
+
+def test_float32_running_slope_matches_float64(complex_dem):
+    """Test that float32 working buffers keep slope percentages accurate."""
+    # Lift the surface to a realistic elevation so rounding error is not hidden
+    dem = complex_dem.astype(np.float64) + 300.0
+
+    slope64 = compute_running_slope(dem, 0.5, 0.5, None, dtype=np.float64)
+    slope32 = compute_running_slope(dem, 0.5, 0.5, None, dtype=np.float32)
+
+    assert slope32.dtype == np.float32
+    assert np.nanmax(slope32) == pytest.approx(np.nanmax(slope64), abs=0.01)
+    np.testing.assert_allclose(slope32, slope64, atol=0.01)
+
+
+@pytest.mark.parametrize("axis", ["x", "y"])
+def test_slope_kernel_matches_np_gradient(monkeypatch, complex_dem, axis):
+    """Test that the fused Numba stencil reproduces the np.gradient results."""
+    if not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    dem = complex_dem.astype(np.float64)
+    dem[3:5, 7:9] = -9999.0
+
+    running = compute_running_slope(dem, 0.5, 1.0, -9999.0, dtype=np.float64)
+    cross = compute_cross_slope(dem, 0.5, 1.0, axis, -9999.0, dtype=np.float64)
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", False)
+    expected_running = compute_running_slope(dem, 0.5, 1.0, -9999.0, dtype=np.float64)
+    expected_cross = compute_cross_slope(dem, 0.5, 1.0, axis, -9999.0, dtype=np.float64)
+
+    np.testing.assert_allclose(running, expected_running, rtol=1e-12)
+    np.testing.assert_allclose(cross, expected_cross, rtol=1e-12)
+
+
+def test_gradient_points_kernel_matches_np_gradient(complex_dem):
+    """Test that the point-sampled stencil matches np.gradient, edges included."""
+    if not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    dem = complex_dem.astype(np.float64)
+    rows = np.array([0, 0, 19, 7, 19, 12])
+    cols = np.array([0, 19, 0, 11, 19, 3])
+    gx = np.empty(len(rows))
+    gy = np.empty(len(rows))
+    _kernels.gradient_points_kernel(dem, rows, cols, 0.5, 2.0, gx, gy)
+
+    expected_gy, expected_gx = np.gradient(dem, 2.0, 0.5)
+    np.testing.assert_allclose(gx, expected_gx[rows, cols], rtol=1e-12)
+    np.testing.assert_allclose(gy, expected_gy[rows, cols], rtol=1e-12)
+
+
+def test_slope_functions_leave_input_untouched(nodata_dem):
+    """Test that masking nodata never writes into the caller's DEM."""
+    dem = nodata_dem.copy()
+    running = compute_running_slope(dem, 1.0, 1.0, -9999.0)
+
+    assert running.dtype == np.float32
+    assert np.isnan(running[0, 0])
+    np.testing.assert_array_equal(dem, nodata_dem)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_compute_slopes_matches_separate_functions(monkeypatch, complex_dem, use_numba):
+    """Test that the fused running/cross computation matches the single functions."""
+    if use_numba and not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", use_numba)
+
+    running, cross = compute_slopes(complex_dem, 1.0, 1.0, "y", None)
+
+    np.testing.assert_array_equal(running, compute_running_slope(complex_dem, 1.0, 1.0, None))
+    np.testing.assert_array_equal(cross, compute_cross_slope(complex_dem, 1.0, 1.0, "y", None))
@@ -1,12 +1,21 @@
 import os
 import sys
 import geopandas as gpd
+import pandas as pd
 from shapely.geometry import Point
 import pytest
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # noqa: E402
-from ada_slope.core import compute_slope_segments, convert_polygons_to_lines
+from ada_slope import _kernels, _raster_cache
+from ada_slope import core
+from ada_slope.core import (
+    compute_slope_segments,
+    compute_window_slopes,
+    convert_polygons_to_lines,
+)
 from ada_slope.io import ensure_vector_matches_raster_crs as align_crs
+from ada_slope import io as ada_io
+from ada_slope.io import sample_elevation_at_points
 
 # Import compute_smoothed_slopes from the top-level app.py to avoid package
 # name collisions with backend/app
@@ -25,7 +34,7 @@ def test_compute_slope_segments_basic():
         {
             "path_id": [1, 1, 1],
             "elevation": [0.0, 1.0, 1.5],
-            "geometry": [Point(0, 0), Point(10, 0), Point(20, 0)],
+            "geometry": gpd.points_from_xy([0, 10, 20], [0, 0, 0]),
         },
         crs="EPSG:26917",
     )
@@ -38,6 +47,55 @@ def test_compute_slope_segments_basic():
     assert compliance == [False, True]
 
 
+def test_compute_slope_segments_multiple_paths():
+    # Rows of the two paths are interleaved; segments must not span paths
+    points = gpd.GeoDataFrame(
+        {
+            "path_id": [2, 1, 2, 1, 1],
+            "elevation": [5.0, 0.0, 4.0, 0.2, 0.4],
+            "geometry": gpd.points_from_xy([0, 0, 10, 10, 20], [50, 0, 50, 0, 0]),
+        },
+        crs="EPSG:26917",
+    )
+
+    segments = compute_slope_segments(points)
+
+    assert list(segments["path_id"]) == [1, 1, 2]
+    assert list(segments["slope"]) == pytest.approx([0.02, 0.02, -0.1])
+    assert list(segments["ada_compliant"]) == [True, True, False]
+
+
+def test_compute_slope_segments_without_path_id_follows_index():
+    points = gpd.GeoDataFrame(
+        {
+            "elevation": [1.0, 0.0, 1.5],
+            "geometry": gpd.points_from_xy([10, 0, 20], [0, 0, 0]),
+        },
+        index=[1, 0, 2],
+        crs="EPSG:26917",
+    )
+
+    segments = compute_slope_segments(points)
+
+    assert list(segments["path_id"]) == [None, None]
+    assert list(segments["slope"]) == pytest.approx([0.1, 0.05])
+
+
+def test_compute_slope_segments_skips_missing_geometries():
+    points = gpd.GeoDataFrame(
+        {
+            "path_id": [1, 1, 1, None, 1],
+            "elevation": [0.0, 9.0, 1.0, 9.0, 1.5],
+            "geometry": [Point(0, 0), Point(), Point(10, 0), Point(15, 0), Point(20, 0)],
+        },
+        crs="EPSG:26917",
+    )
+
+    segments = compute_slope_segments(points)
+
+    assert list(segments["slope"]) == pytest.approx([0.1, 0.05])
+
+
 def test_convert_polygons_to_lines():
     from shapely.geometry import Polygon, MultiPolygon, LineString
 
@@ -52,6 +110,22 @@ def test_convert_polygons_to_lines():
     assert all(lines.geometry.type == "LineString")
 
 
+def test_convert_polygons_to_lines_keeps_z():
+    from shapely.geometry import Polygon, LineString
+
+    line_3d = LineString([(4, 0, 10), (5, 0, 11)])
+    poly_3d = Polygon([(0, 0, 1), (1, 0, 2), (1, 1, 3), (0, 0, 1)])
+    poly_2d = Polygon([(2, 0), (3, 0), (3, 1), (2, 0)])
+
+    gdf = gpd.GeoDataFrame({"geometry": [line_3d, poly_3d, poly_2d]}, crs="EPSG:26917")
+    lines = convert_polygons_to_lines(gdf)
+
+    assert lines.geometry.has_z.tolist() == [True, True, False]
+    assert lines.geometry.iloc[0].equals(line_3d)
+    assert list(lines.geometry.iloc[1].coords) == list(poly_3d.exterior.coords)
+    assert list(lines.geometry.iloc[2].coords) == list(poly_2d.exterior.coords)
+
+
 def test_align_crs(tmp_path):
     import numpy as np
     import rasterio
@@ -78,15 +152,302 @@ def test_align_crs(tmp_path):
     assert aligned.crs.to_string() == "EPSG:3857"
 
 
+@pytest.mark.parametrize("max_window_pixels", [None, 1])
+def test_sample_elevation_at_points(tmp_path, monkeypatch, max_window_pixels):
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_origin
+
+    if max_window_pixels is not None:
+        # Force the block-by-block path
+        monkeypatch.setattr(ada_io, "MAX_WINDOW_PIXELS", max_window_pixels)
+
+    raster_path = tmp_path / "dem.tif"
+    arr = np.arange(16, dtype="float32").reshape(4, 4)
+    arr[1, 1] = -9999.0
+    with rasterio.open(
+        raster_path,
+        "w",
+        driver="GTiff",
+        height=4,
+        width=4,
+        count=1,
+        dtype="float32",
+        crs="EPSG:26917",
+        transform=from_origin(0, 4, 1, 1),
+        nodata=-9999.0,
+    ) as dst:
+        dst.write(arr, 1)
+
+    points = gpd.GeoDataFrame(
+        {"geometry": gpd.points_from_xy([0.5, 2.5, 1.5, 10], [3.5, 0.5, 2.5, 10])},
+        crs="EPSG:26917",
+    )
+    sampled = sample_elevation_at_points(points, str(raster_path))
+
+    elevations = sampled["elevation"].to_numpy()
+    assert elevations[:2].tolist() == [0.0, 14.0]
+    assert np.isnan(elevations[2])  # nodata pixel
+    assert np.isnan(elevations[3])  # outside the raster
+
+
+def test_sample_elevation_reprojects_feet_crs_to_metres(tmp_path):
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_origin
+
+    # Florida East state plane, US survey feet
+    raster_path = tmp_path / "dem_ft.tif"
+    with rasterio.open(
+        raster_path,
+        "w",
+        driver="GTiff",
+        height=2,
+        width=2,
+        count=1,
+        dtype="float32",
+        crs="EPSG:2236",
+        transform=from_origin(600000, 700000, 10, 10),
+    ) as dst:
+        dst.write(np.full((2, 2), 5.0, dtype="float32"), 1)
+
+    points = gpd.GeoDataFrame({"geometry": [Point(600005, 699995)]}, crs="EPSG:2236")
+    sampled = sample_elevation_at_points(points, str(raster_path))
+
+    assert sampled.crs.to_epsg() == 26917
+    assert sampled["elevation"].tolist() == [5.0]
+
+
+def test_points_to_crs_matches_geopandas():
+    from ada_slope.io import _pyproj_crs, _points_to_crs
+
+    points = gpd.GeoDataFrame(
+        {"path_id": [1, 2]}, geometry=gpd.points_from_xy([-84.29, -84.30], [30.44, 30.45]), crs="EPSG:4326"
+    )
+    result = _points_to_crs(points, _pyproj_crs("EPSG:26917"))
+    expected = points.to_crs("EPSG:26917")
+
+    assert result.crs == expected.crs
+    assert result["path_id"].tolist() == [1, 2]
+    assert result.geometry.geom_equals_exact(expected.geometry, tolerance=1e-6).all()
+
+
+def test_ensure_projected():
+    from shapely.geometry import LineString
+
+    points = gpd.GeoDataFrame(geometry=[Point(-84.29, 30.44)], crs="EPSG:4326")
+    lines = gpd.GeoDataFrame(geometry=[LineString([(-84.29, 30.44), (-84.30, 30.45)])], crs="EPSG:4326")
+
+    for gdf in (points, lines):
+        projected = ada_io.ensure_projected(gdf)
+        expected = gdf.to_crs("EPSG:26917")
+        assert projected.crs == expected.crs
+        assert projected.geometry.geom_equals_exact(expected.geometry, tolerance=1e-6).all()
+        assert ada_io.ensure_projected(projected) is projected
+
+
+@pytest.mark.parametrize("suffix", [".geojson", ".fgb", ".gpkg", ".parquet"])
+def test_geodata_round_trip(tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    gdf = gpd.GeoDataFrame(
+        {"path_id": [1, 2], "elevation": [0.5, 1.5]},
+        geometry=gpd.points_from_xy([0, 10], [0, 5]),
+        crs="EPSG:26917",
+    )
+    path = str(tmp_path / f"points{suffix}")
+
+    ada_io.write_geodata(gdf, path)
+    result = ada_io.read_geodata(path)
+
+    assert result.crs == gdf.crs
+    assert result[["path_id", "elevation"]].values.tolist() == [[1, 0.5], [2, 1.5]]
+    assert result.geometry.geom_equals(gdf.geometry).all()
+
+    attrs = ada_io.read_attributes(path, ["elevation"])
+    assert list(attrs.columns) == ["elevation"]
+    assert attrs["elevation"].tolist() == [0.5, 1.5]
+    batches = list(ada_io.iter_attributes(path, ["elevation"], batch_size=1))
+    assert pd.concat(batches)["elevation"].tolist() == [0.5, 1.5]
+
+
+def test_raster_cache_reuses_and_closes_handles(tmp_path):
+    import os
+
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_origin
+
+    raster_path = str(tmp_path / "dem.tif")
+    profile = dict(
+        driver="GTiff", height=2, width=2, count=1, dtype="float32",
+        crs="EPSG:26917", transform=from_origin(0, 2, 1, 1),
+    )
+    with rasterio.open(raster_path, "w", **profile) as dst:
+        dst.write(np.zeros((2, 2), dtype="float32"), 1)
+
+    first = _raster_cache.get_dataset(raster_path)
+    assert _raster_cache.get_dataset(raster_path) is first
+
+    # A rewritten file is reopened rather than served from the stale handle
+    with rasterio.open(raster_path, "w", **profile) as dst:
+        dst.write(np.ones((2, 2), dtype="float32"), 1)
+    stat = os.stat(raster_path)
+    os.utime(raster_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = _raster_cache.get_dataset(raster_path)
+    assert second is not first and first.closed
+    assert second.read(1)[0, 0] == 1.0
+
+    # Another thread gets its own handle, which closes when the thread exits
+    import gc
+    import threading
+
+    handles = []
+    worker = threading.Thread(target=lambda: handles.append(_raster_cache.get_dataset(raster_path)))
+    worker.start()
+    worker.join()
+    gc.collect()
+    assert handles[0] is not second and handles[0].closed
+    assert not second.closed
+
+    _raster_cache.close_all()
+    assert second.closed
+
+
 def test_compute_smoothed_slopes_insufficient_points():
     gdf = gpd.GeoDataFrame(
         {
             "path_id": [1, 1],
             "elevation": [0.0, 1.0],
-            "geometry": [Point(0, 0), Point(10, 0)],
+            "geometry": gpd.points_from_xy([0, 10], [0, 0]),
         },
         crs="EPSG:26917",
     )
 
     result = compute_smoothed_slopes(gdf, window_size=5)
     assert result.empty
+
+
+def test_compute_smoothed_slopes_window():
+    gdf = gpd.GeoDataFrame(
+        {
+            "path_id": [1, 1, 1, 1, 1],
+            "elevation": [0.0, 0.5, 1.0, None, 2.0],
+            "geometry": gpd.points_from_xy([0, 5, 10, 15, 20], [0, 0, 0, 0, 0]),
+        },
+        crs="EPSG:26917",
+    )
+
+    result = compute_smoothed_slopes(gdf, window_size=3)
+
+    # Only the window centred on the second point has no missing elevation
+    assert list(result["slope"]) == pytest.approx([0.1])
+    assert list(result["ada_compliant"]) == [False]
+
+
+def test_compute_smoothed_slopes_multiple_paths():
+    gdf = gpd.GeoDataFrame(
+        {
+            "path_id": [1, 2, 1, 2, 1, 2],
+            "elevation": [0.0, 0.0, 0.1, 1.0, 0.2, 2.0],
+            "geometry": gpd.points_from_xy([0, 0, 10, 10, 20, 20], [0, 1, 0, 1, 0, 1]),
+        },
+        crs="EPSG:26917",
+    )
+
+    result = compute_smoothed_slopes(gdf, window_size=3)
+
+    assert list(result["path_id"]) == [1, 2]
+    assert list(result["slope"]) == pytest.approx([0.01, 0.1])
+    assert list(result["ada_compliant"]) == [True, False]
+
+
+def test_compute_smoothed_slopes_skips_empty_points():
+    gdf = gpd.GeoDataFrame(
+        {
+            "path_id": [1, 1, 1, 1],
+            "elevation": [0.0, 99.0, 0.5, 1.0],
+            "geometry": [Point(0, 0), Point(), Point(5, 0), Point(10, 0)],
+        },
+        crs="EPSG:26917",
+    )
+
+    result = compute_smoothed_slopes(gdf, window_size=3)
+
+    # The empty point and its elevation are dropped together
+    assert list(result["slope"]) == pytest.approx([0.1])
+
+
+def test_compute_window_slopes_rejects_mismatched_lengths():
+    import numpy as np
+
+    with pytest.raises(ValueError, match="same length"):
+        compute_window_slopes(np.arange(4.0), np.zeros(4), np.zeros(5), half_window=1, threshold=0.05)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_compute_window_slopes_kernel_matches_numpy(monkeypatch, use_numba):
+    import numpy as np
+
+    if use_numba and not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", use_numba)
+
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.5, 2.0, 50))
+    y = np.zeros(50)
+    elev = rng.uniform(0, 1, 50)
+    elev[[7, 30]] = np.nan
+
+    slope, compliant = compute_window_slopes(x, y, elev, half_window=2, threshold=0.05)
+
+    expected = np.full(50, np.nan)
+    for i in range(2, 48):
+        window = elev[i - 2 : i + 3]
+        if not np.isnan(window).any():
+            expected[i] = (elev[i + 2] - elev[i - 2]) / (x[i + 2] - x[i - 2])
+    np.testing.assert_allclose(slope, expected)
+    np.testing.assert_array_equal(compliant, np.abs(expected) <= 0.05)
+
+
+def test_compute_slope_segments_kernel_matches_numpy(monkeypatch):
+    import numpy as np
+
+    if not _kernels.HAS_NUMBA:
+        pytest.skip("numba not installed")
+
+    rng = np.random.default_rng(0)
+    elev = rng.uniform(0, 1, 40)
+    elev[[3, 20]] = np.nan
+    points = gpd.GeoDataFrame(
+        {
+            "path_id": rng.integers(0, 3, 40),
+            "elevation": elev,
+            "geometry": gpd.points_from_xy(np.append(np.arange(39), 38), np.append(np.arange(39) % 4, 2)),
+        },
+        crs="EPSG:26917",
+    )
+
+    kernel = compute_slope_segments(points)
+    monkeypatch.setattr(_kernels, "HAS_NUMBA", False)
+    expected = compute_slope_segments(points)
+
+    assert kernel["path_id"].tolist() == expected["path_id"].tolist()
+    np.testing.assert_array_equal(kernel["slope"], expected["slope"])
+    np.testing.assert_array_equal(kernel["ada_compliant"], expected["ada_compliant"])
+    assert kernel.geometry.geom_equals(expected.geometry).all()
+
+
+def test_segment_lines_threaded_matches_serial(monkeypatch):
+    import numpy as np
+    import shapely
+
+    rng = np.random.default_rng(0)
+    ends = rng.uniform(0, 100, (1000, 2, 2))
+    serial = shapely.linestrings(ends)
+
+    monkeypatch.setattr(core, "PARALLEL_MIN_SEGMENTS", 1)
+    threaded = core.segment_lines(ends, max_workers=4)
+
+    assert len(threaded) == len(serial)
+    assert shapely.equals(threaded, serial).all()
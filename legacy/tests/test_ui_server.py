@@ -0,0 +1,61 @@
+"""Test the UI server's in-process analysis."""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+rasterio = pytest.importorskip("rasterio")
+
+UI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "ui")
+
+# Uploads a small DEM and paths layer, then lets the interpreter exit normally
+UPLOAD_SCRIPT = textwrap.dedent(
+    """
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from rasterio.io import MemoryFile
+    from rasterio.transform import from_origin
+
+    import server
+
+    dem = np.tile(np.arange(50, dtype="float32") * 0.03, (50, 1))
+    with MemoryFile() as mem:
+        with mem.open(driver="GTiff", width=50, height=50, count=1, dtype="float32",
+                      crs="EPSG:26917", transform=from_origin(500000, 3400050, 1, 1)) as dst:
+            dst.write(dem, 1)
+        dem_bytes = mem.read()
+    paths = (
+        b'{"type": "FeatureCollection", "crs": {"type": "name", "properties": '
+        b'{"name": "EPSG:26917"}}, "features": [{"type": "Feature", "properties": {}, '
+        b'"geometry": {"type": "LineString", "coordinates": '
+        b'[[500005, 3400025], [500045, 3400025]]}}]}'
+    )
+
+    client = TestClient(server.app)
+    r = client.post("/api/upload", files={
+        "dem": ("dem.tif", dem_bytes, "image/tiff"),
+        "paths": ("paths.geojson", paths, "application/geo+json"),
+    })
+    assert r.status_code == 200, r.text
+    assert r.json()["result"]["summary"]["total_paths"] == 1, r.text
+    # The result file is passed through as written, without GeoPandas' feature ids
+    assert "id" not in r.json()["result"]["geojson"]["features"][0], r.text
+    """
+)
+
+
+def test_upload_then_clean_exit(tmp_path):
+    # The analysis runs numba kernels on a worker thread; the process must still
+    # shut down once the request is served
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([UI_DIR, os.environ.get("PYTHONPATH", "")]))
+    env.pop("NUMBA_THREADING_LAYER_PRIORITY", None)
+    result = subprocess.run(
+        [sys.executable, "-c", UPLOAD_SCRIPT],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=180,
+    )
+    assert result.returncode == 0, result.stderr
@@ -1,4 +1,5 @@
 import rasterio
+from rasterio.windows import Window
 
 
 def inspect_raster(path):
@@ -12,9 +13,9 @@ def inspect_raster(path):
         print(f" - Bands: {src.count}")
         print(f" - Data Type: {src.dtypes[0]}")
 
-    # Centering the pixel values
+        # Read only the centre pixel rather than the whole band
         row, col = src.height // 2, src.width // 2
-        value = src.read(1)[row, col]
+        value = src.read(1, window=Window(col, row, 1, 1))[0, 0]
     print(f" - Sample elevation at center: {value} meters")
 
 
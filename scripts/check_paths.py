@@ -1,18 +1,18 @@
-import geopandas as gpd
 from ada_slope.core import convert_polygons_to_lines
 from ada_slope.io import ensure_vector_matches_raster_crs as align_crs
+from ada_slope.io import read_geodata, write_geodata
 
 
 def inspect_paths(path_fp, raster_fp=None):
     # Load the path dataset (GeoJSON) using GeoPandas
     # Each row in this GeoDataFrame represents a geographic feature, like a footpath or sidewalk
-    gdf = gpd.read_file(path_fp)
+    gdf = read_geodata(path_fp)
 
     print("Original feature count (includes all geometry types):", len(gdf))
 
     gdf = convert_polygons_to_lines(gdf)
     print("Geometry types after conversion:")
-    print(gdf.geometry.type.value_counts())
+    print(gdf.geom_type.value_counts())
 
     if raster_fp:
         gdf = align_crs(gdf, raster_fp)
@@ -22,7 +22,7 @@ def inspect_paths(path_fp, raster_fp=None):
 
     # Step 3: Save the cleaned and reprojected path dataset for later use
     # Saving as GeoJSON retains both the geometry and attribute fields
-    gdf.to_file("data/processed/fsu_paths_cleaned.geojson", driver="GeoJSON")
+    write_geodata(gdf, "data/processed/fsu_paths_cleaned.geojson")
     print("Cleaned path data saved to: data/processed/fsu_paths_cleaned.geojson")
 
     # Step 4: Display a sample path geometry to verify structure
@@ -1,7 +1,8 @@
-import geopandas as gpd
 import rasterio
 import logging
 
+from ada_slope.io import read_geodata
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def check_crs_consistency(raster_fp, points_fp, elevation_points_fp):
 
     # Load input resampled points
     try:
-        gdf_points = gpd.read_file(points_fp)
+        gdf_points = read_geodata(points_fp)
         logger.info("Original Points CRS: %s", 
                    gdf_points.crs.to_string() if gdf_points.crs else "None")
     except Exception as e:
@@ -28,7 +29,7 @@ def check_crs_consistency(raster_fp, points_fp, elevation_points_fp):
 
     # Load output points with elevation
     try:
-        gdf_elevated = gpd.read_file(elevation_points_fp)
+        gdf_elevated = read_geodata(elevation_points_fp)
         logger.info("Elevation-Sampled Points CRS: %s", 
                    gdf_elevated.crs.to_string() if gdf_elevated.crs else "None")
     except Exception as e:
@@ -1,7 +1,10 @@
 import geopandas as gpd
-from shapely.geometry import LineString
+import numpy as np
+import shapely
 import matplotlib.pyplot as plt
 
+from ada_slope.io import read_geodata, write_geodata
+
 ADA_SLOPE_THRESHOLD = 0.05  # ADA compliance: 5% max slope
 
 
@@ -10,7 +13,7 @@ def compute_slopes_by_path(points_fp, output_fp):
     Computes slope segments between adjacent elevation points, grouped by path_id,
     flags whether each segment is ADA compliant, and saves results.
     """
-    gdf_points = gpd.read_file(points_fp)
+    gdf_points = read_geodata(points_fp)
     if gdf_points.crs is None:
         raise ValueError("Input data must have a CRS")
     if gdf_points.crs.is_geographic:
@@ -19,37 +22,41 @@ def compute_slopes_by_path(points_fp, output_fp):
     if "path_id" not in gdf_points.columns:
         raise ValueError("Missing 'path_id' field in points dataset. Ensure resampling included path_id tagging.")
 
-    grouped = gdf_points.groupby("path_id")
-
-    segments, slopes, compliance, group_ids = [], [], [], []
+    # Extract coordinates and elevations once, in index order, then slice per path
+    gdf_points = gdf_points.sort_index()
+    all_coords = shapely.get_coordinates(gdf_points.geometry.values)
+    all_el = gdf_points["elevation"].to_numpy(dtype=np.float64)
+    grouped = gdf_points.groupby("path_id").indices
 
-    for path_id, group in grouped:
-        group = group.sort_index().reset_index(drop=True)
+    segments, slopes, group_ids = [], [], []
 
-        for i in range(len(group) - 1):
-            pt1, pt2 = group.iloc[i], group.iloc[i + 1]
+    for path_id, idx in grouped.items():
+        coords = all_coords[idx]
+        el = all_el[idx]
 
-            if pt1["elevation"] is None or pt2["elevation"] is None:
-                continue
+        # All consecutive pairs at once; skip pairs with a missing elevation
+        dist = np.hypot(*np.diff(coords, axis=0).T)
+        elev_diff = np.diff(el)
+        slope = np.divide(elev_diff, dist, out=np.zeros_like(elev_diff), where=dist != 0)
+        valid = ~np.isnan(elev_diff)
 
-            elev_diff = pt2["elevation"] - pt1["elevation"]
-            dist = pt1.geometry.distance(pt2.geometry)
-            slope = elev_diff / dist if dist != 0 else 0
+        segments.append(np.stack([coords[:-1], coords[1:]], axis=1)[valid])
+        slopes.append(slope[valid])
+        group_ids.append(np.full(int(valid.sum()), path_id))
 
-            segment = LineString([pt1.geometry, pt2.geometry])
-            segments.append(segment)
-            slopes.append(round(slope, 4))
-            compliance.append(abs(slope) <= ADA_SLOPE_THRESHOLD)
-            group_ids.append(path_id)
+    # Classify on the exact slopes, then round them in place for output
+    slope = np.concatenate(slopes) if slopes else np.empty(0)
+    compliance = np.abs(slope) <= ADA_SLOPE_THRESHOLD
+    np.round(slope, 4, out=slope)
 
     gdf_slopes = gpd.GeoDataFrame({
-        "path_id": group_ids,
-        "slope": slopes,
+        "path_id": np.concatenate(group_ids) if group_ids else [],
+        "slope": slope,
         "ada_compliant": compliance,
-        "geometry": segments
+        "geometry": shapely.linestrings(np.concatenate(segments) if segments else np.empty((0, 2, 2))),
     }, crs=gdf_points.crs)
 
-    gdf_slopes.to_file(output_fp, driver="GeoJSON")
+    write_geodata(gdf_slopes, output_fp)
     print(f"Slope segments saved to: {output_fp}")
     print(f"Non-compliant segments: {(~gdf_slopes['ada_compliant']).sum()}")
 
@@ -12,33 +12,108 @@ Compute running & cross-slope along pedestrian paths against a DEM.
 Usage:
   python scripts/eval_ada.py --dem data/dem.tif --paths data/paths_osm.geojson --out outputs/paths_ada_eval.geojson
 """
-import math
 import argparse
-from typing import List
+from typing import Tuple
 import numpy as np
-import geopandas as gpd
 import rasterio
-from shapely.geometry import LineString, Point
-from pyproj import Transformer
-
-def _densify_line(line: LineString, every_m: float, crs: str) -> List[Point]:
-    # project to meters for even spacing
-    to_m = Transformer.from_crs(crs, 3857, always_xy=True)
-    to_src = Transformer.from_crs(3857, crs, always_xy=True)
-    xs, ys = to_m.transform(*line.xy)
-    metr = LineString(list(zip(xs, ys)))
-    length = metr.length
-    pts_m = [metr.interpolate(d) for d in np.arange(0, length + 1e-6, every_m)]
-    x, y = to_src.transform([p.x for p in pts_m], [p.y for p in pts_m])
-    return [Point(px, py) for px, py in zip(x, y)]
-
-def _bearing_deg(p0: Point, p1: Point) -> float:
-    dx, dy = (p1.x - p0.x), (p1.y - p0.y)
-    return (math.degrees(math.atan2(dx, dy)) + 360.0) % 360.0  # 0=N, 90=E
+from rasterio.windows import Window
+import shapely
+from ada_slope import _kernels
+from ada_slope.io import read_geodata, write_geodata
+
+# Side (in pixels) of the DEM tiles read one at a time; ~16 MiB of float32 each
+TILE_PIXELS = 2048
+
+def _densify_lines(geoms: np.ndarray, spacing: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Densify an array of LineStrings every *spacing* CRS units in one pass.
+
+    Returns flat x/y arrays of the points of all lines, in order, and the number
+    of points per geometry (0 for missing, empty or non-LineString geometries).
+    The lines must be in a projected CRS so distances are linear.
+    """
+    counts = np.zeros(len(geoms), dtype=np.int64)
+    is_line = (shapely.get_type_id(geoms) == shapely.GeometryType.LINESTRING) & ~shapely.is_empty(geoms)
+    if not is_line.any():
+        return np.empty(0), np.empty(0), counts
+    coords, idx = shapely.get_coordinates(geoms[is_line], return_index=True)
+    xs, ys = coords[:, 0], coords[:, 1]
+
+    # cumulative arc length of all lines on one axis, with a unit gap between
+    # consecutive lines so interpolation never blends two of them
+    same = idx[1:] == idx[:-1]
+    step = np.where(same, np.hypot(np.diff(xs), np.diff(ys)), 1.0)
+    cum = np.concatenate(([0.0], np.cumsum(step)))
+    first = np.flatnonzero(np.concatenate(([True], ~same)))
+    last = np.concatenate((first[1:] - 1, [len(xs) - 1]))
+    lengths = cum[last] - cum[first]
+
+    # same sample distances as np.arange(0, length + 1e-6, spacing) per line
+    npts = np.ceil((lengths + 1e-6) / spacing).astype(np.int64)
+    d = (np.arange(npts.sum()) - np.repeat(np.cumsum(npts) - npts, npts)) * spacing
+    d = np.minimum(d, np.repeat(lengths, npts)) + np.repeat(cum[first], npts)
+    counts[is_line] = npts
+    return np.interp(d, cum, xs), np.interp(d, cum, ys), counts
+
+def _pixel_index(transform, shape, xs: np.ndarray, ys: np.ndarray):
+    """Row/col of the pixels containing the given coordinates, and which are inside.
+
+    Applies the inverse affine to the coordinate arrays directly (same result
+    as rasterio's rowcol) to skip its per-call Python overhead.
+    """
+    inv = ~transform
+    cols = np.floor(inv.a * xs + inv.b * ys + inv.c).astype(np.int64)
+    rows = np.floor(inv.d * xs + inv.e * ys + inv.f).astype(np.int64)
+    inside = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+    return rows, cols, inside
+
+def _gradient_at_pixels(arr: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                        resx: float, resy: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(dz/dx, dz/dy) of *arr* at the given pixels, which must lie inside it.
+
+    With Numba the stencil is evaluated only at the sampled pixels; otherwise the
+    full gradient is computed with np.gradient and sampled from an interleaved
+    (H, W, 2) array, so one gather fetches both components of a pixel.
+    """
+    if _kernels.HAS_NUMBA:
+        gx = np.empty(len(rows), dtype=arr.dtype)
+        gy = np.empty(len(rows), dtype=arr.dtype)
+        _kernels.gradient_points_kernel(arr, rows, cols, resx, resy, gx, gy)
+        return gx, gy
+    grad = np.empty(arr.shape + (2,), dtype=arr.dtype)
+    grad[..., 1], grad[..., 0] = np.gradient(arr, resy, resx)  # dz/dy, dz/dx
+    gxgy = grad[rows, cols]
+    return gxgy[:, 0], gxgy[:, 1]
+
+def _sample_gradient(dem, xs: np.ndarray, ys: np.ndarray, resx: float, resy: float,
+                     tile: int = TILE_PIXELS) -> Tuple[np.ndarray, np.ndarray]:
+    """(dz/dx, dz/dy) of the DEM at the given coordinates; NaN outside the raster.
+
+    The DEM is never read whole: points are bucketed into *tile* x *tile* pixel
+    blocks and each occupied block is read on its own, trimmed to its points plus
+    a 1-pixel halo, so the stencil at every point matches the full-raster gradient.
+    """
+    gx = np.full(len(xs), np.nan, dtype=np.float32)
+    gy = np.full(len(xs), np.nan, dtype=np.float32)
+    rows, cols, inside = _pixel_index(dem.transform, dem.shape, xs, ys)
+    idx = np.flatnonzero(inside)
+    if idx.size == 0:
+        return gx, gy
+    tile_id = (rows[idx] // tile) * (dem.width // tile + 1) + cols[idx] // tile
+    order = np.argsort(tile_id, kind="stable")
+    splits = np.flatnonzero(np.diff(tile_id[order])) + 1
+    for group in np.split(idx[order], splits):
+        r, c = rows[group], cols[group]
+        row0, row1 = max(r.min() - 1, 0), min(r.max() + 2, dem.height)
+        col0, col1 = max(c.min() - 1, 0), min(c.max() + 2, dem.width)
+        arr = dem.read(1, window=Window.from_slices((row0, row1), (col0, col1))).astype("float32")
+        if dem.nodata is not None:
+            arr[arr == dem.nodata] = np.nan
+        gx[group], gy[group] = _gradient_at_pixels(arr, r - row0, c - col0, resx, resy)
+    return gx, gy
 
 def main(dem_path: str, paths_path: str, out_path: str,
          interval_m: float = 2.0, run_thr: float = 5.0, cross_thr: float = 2.083):
-    paths = gpd.read_file(paths_path)
+    paths = read_geodata(paths_path)
 
     with rasterio.open(dem_path) as dem:
         if dem.crs is None:
@@ -50,65 +125,58 @@ def main(dem_path: str, paths_path: str, out_path: str,
         
         # Align paths to DEM CRS
         paths = paths.to_crs(dem.crs)
-        arr = dem.read(1).astype("float32")
-        if dem.nodata is not None:
-            arr[arr == dem.nodata] = np.nan
-        resx, resy = dem.res
-        gy, gx = np.gradient(arr, resy, resx)  # dz/dy, dz/dx
-        slope_pct = np.sqrt(gx**2 + gy**2) * 100.0
-        aspect_deg = (np.degrees(np.arctan2(gx, gy)) + 360.0) % 360.0  # downslope azimuth
-
-        def sample(values: np.ndarray, pt: Point) -> float:
-            r, c = dem.index(pt.x, pt.y)
-            if 0 <= r < values.shape[0] and 0 <= c < values.shape[1]:
-                v = float(values[r, c])
-                return v if math.isfinite(v) else float("nan")
-            return float("nan")
-
-        results = []
-        for i, row in paths.iterrows():
-            geom: LineString = row.geometry
-            if geom is None or geom.is_empty or not isinstance(geom, LineString):
-                results.append({"running_max": np.nan, "cross_max": np.nan,
-                                "running_ok": False, "cross_ok": False})
-                continue
-
-            pts = _densify_line(geom, every_m=interval_m, crs=str(paths.crs))
-            if len(pts) < 2:
-                results.append({"running_max": np.nan, "cross_max": np.nan,
-                                "running_ok": False, "cross_ok": False})
-                continue
-
-            # segment bearings
-            bears = [_bearing_deg(pts[j], pts[j+1]) for j in range(len(pts)-1)]
-
-            # sample at segment midpoints for stability
-            run_vals, cross_vals = [], []
-            for j in range(len(pts)-1):
-                p0, p1 = pts[j], pts[j+1]
-                mid = Point((p0.x + p1.x) / 2.0, (p0.y + p1.y) / 2.0)
-                S = sample(slope_pct, mid)
-                A = sample(aspect_deg, mid)
-                b = bears[j]
-                if not (math.isfinite(S) and math.isfinite(A)):
-                    continue
-                cross = S * abs(math.sin(math.radians(A - b)))
-                run_vals.append(S)
-                cross_vals.append(cross)
-
-            rmax = float(np.nanmax(run_vals)) if run_vals else np.nan
-            cmax = float(np.nanmax(cross_vals)) if cross_vals else np.nan
-            results.append({
-                "running_max": rmax,
-                "cross_max": cmax,
-                "running_ok": (rmax <= run_thr) if math.isfinite(rmax) else False,
-                "cross_ok":   (cmax <= cross_thr) if math.isfinite(cmax) else False,
-            })
+        # float32 spacing keeps the gradient, and everything derived from it, in float32
+        resx, resy = np.float32(dem.res[0]), np.float32(dem.res[1])
+
+        # Densify every path first so all segment midpoints are sampled in one go.
+        # Paths are in the DEM's projected CRS, so spacing is converted from
+        # meters to its linear unit instead of round-tripping through Web Mercator.
+        _, unit_m = dem.crs.linear_units_factor
+        spacing = interval_m / unit_m
+        px, py, npts = _densify_lines(paths.geometry.values, spacing)
+        counts = np.maximum(npts - 1, 0)  # segments per path
+
+        # sample at segment midpoints for stability; pairs that straddle two
+        # paths are not segments
+        in_path = np.repeat(np.arange(len(paths)), npts)
+        seg = in_path[1:] == in_path[:-1]
+        mx = ((px[:-1] + px[1:]) / 2.0)[seg]
+        my = ((py[:-1] + py[1:]) / 2.0)[seg]
+        # Slope and aspect are only needed at the midpoints, not as full rasters;
+        # the DEM is read tile by tile around them
+        gx_s, gy_s = _sample_gradient(dem, mx, my, resx, resy)
+        S_all = np.hypot(gx_s, gy_s) * np.float32(100.0)
+        A_all = (np.degrees(np.arctan2(gx_s, gy_s)) + np.float32(360.0)) % np.float32(360.0)  # downslope azimuth
+
+        # segment bearings, 0=N, 90=E; coordinate differences stay float64 for
+        # precision, the angles themselves are float32 like the slope values
+        dx = np.diff(px)[seg]
+        dy = np.diff(py)[seg]
+        B_all = ((np.degrees(np.arctan2(dx, dy)) + 360.0) % 360.0).astype(np.float32)
+
+        # cross-slope component of every segment; NaN where the DEM has no data
+        C_all = S_all * np.abs(np.sin(np.deg2rad(A_all - B_all)))
+        valid = np.isfinite(S_all) & np.isfinite(A_all)
+
+        # Per-path maxima with segmented reductions over the flat segment arrays
+        has_segments = counts > 0
+        starts = (np.cumsum(counts) - counts)[has_segments]
+        running_max = np.full(len(paths), np.nan, dtype=np.float32)
+        cross_max = np.full(len(paths), np.nan, dtype=np.float32)
+        if starts.size:
+            running_max[has_segments] = np.maximum.reduceat(np.where(valid, S_all, np.float32(-np.inf)), starts)
+            cross_max[has_segments] = np.maximum.reduceat(np.where(valid, C_all, np.float32(-np.inf)), starts)
+        running_max[np.isneginf(running_max)] = np.nan  # no segment with DEM data
+        cross_max[np.isneginf(cross_max)] = np.nan
 
         out = paths.copy()
-        for k in results[0].keys():
-            out[k] = [r[k] for r in results]
-        out.to_file(out_path, driver="GeoJSON")
+        out["running_max"] = running_max
+        out["cross_max"] = cross_max
+        # NaN compares False, so paths without data fail both checks
+        out["running_ok"] = running_max <= run_thr
+        out["cross_ok"] = cross_max <= cross_thr
+        # FlatGeobuf for .fgb outputs; GeoJSON, which the UI reads, otherwise
+        write_geodata(out, out_path)
         print(f"Wrote {out_path} — {len(out)} features")
 
 if __name__ == "__main__":
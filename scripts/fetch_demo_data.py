@@ -11,14 +11,17 @@ USAGE (download from URL):
   python scripts/fetch_demo_data.py url --url "https://example.com/small_dem.tif" --out data/demo/sample.tif
 """
 from __future__ import annotations
-import argparse, pathlib, sys
+import argparse, pathlib, shutil, sys, time
 from typing import Tuple
 
 import numpy as np
 import rasterio
 from rasterio.transform import from_origin
+from urllib.error import HTTPError, URLError
 from urllib.request import urlopen
 
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 def write_geotiff(arr: np.ndarray, out_path: pathlib.Path, res: Tuple[float, float] = (1.0, 1.0), nodata=None) -> None:
     h, w = arr.shape
     transform = from_origin(0, 0, res[0], res[1])
@@ -31,16 +34,17 @@ def write_geotiff(arr: np.ndarray, out_path: pathlib.Path, res: Tuple[float, flo
 def synthetic_flat(shape): return np.zeros(shape, dtype="float32")
 
 def synthetic_plane(shape, slope_pct: float, axis: str, resx: float, resy: float):
+    # Read-only broadcast view of one row/column; write_geotiff's astype makes the only copy
     h, w = shape; slope = slope_pct / 100.0
     if axis == "x":
-        x = np.arange(w, dtype="float32"); return (x * resx * slope)[None, :].repeat(h, axis=0)
+        x = np.arange(w, dtype="float32"); return np.broadcast_to((x * resx * slope)[None, :], (h, w))
     elif axis == "y":
-        y = np.arange(h, dtype="float32"); return (y * resy * slope)[:, None].repeat(w, axis=1)
+        y = np.arange(h, dtype="float32"); return np.broadcast_to((y * resy * slope)[:, None], (h, w))
     raise ValueError("axis must be 'x' or 'y'")
 
 def synthetic_hill(shape, amp: float = 50.0):
     h, w = shape; cy, cx = (h - 1) / 2.0, (w - 1) / 2.0
-    yy, xx = np.meshgrid(np.arange(h, dtype="float32"), np.arange(w, dtype="float32"), indexing="ij")
+    yy, xx = np.arange(h, dtype="float32")[:, None], np.arange(w, dtype="float32")[None, :]  # broadcast, like np.ogrid
     rr = np.sqrt((yy - cy) ** 2 + (xx - cx) ** 2); rr_norm = rr / rr.max() if rr.max() > 0 else rr
     arr = amp * (1.0 - rr_norm**2); arr[arr < 0] = 0.0; return arr
 
@@ -53,14 +57,30 @@ def cmd_synthetic(args):
     write_geotiff(arr, pathlib.Path(args.out), res=(resx, resy))
     print(f"Wrote synthetic DEM → {args.out}")
 
+def urlopen_with_retry(url: str, retries: int = 5, backoff: float = 1.0, timeout: float = 30.0):
+    """urlopen that retries transient failures (connection errors, 429/5xx) with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return urlopen(url, timeout=timeout)
+        except HTTPError as e:
+            if e.code not in RETRY_STATUSES or attempt == retries: raise
+            reason = f"HTTP {e.code}"
+        except (URLError, ConnectionError, TimeoutError) as e:
+            if attempt == retries: raise
+            reason = str(e)
+        delay = backoff * 2 ** attempt
+        print(f"  {reason}; retrying in {delay:.0f}s ({attempt + 1}/{retries})")
+        time.sleep(delay)
+
 def cmd_url(args):
     url = args.url; out = pathlib.Path(args.out)
     out.parent.mkdir(parents=True, exist_ok=True)
     print(f"Downloading {url} …")
-    with urlopen(url) as resp: data = resp.read()
     if not (out.suffix.lower() in [".tif", ".tiff"]):
         print("Warning: Output extension is not .tif/.tiff. Saving bytes anyway.")
-    out.write_bytes(data); print(f"Wrote downloaded file → {out}")
+    # Stream to disk in 1 MiB chunks rather than holding the whole file in memory
+    with urlopen_with_retry(url) as resp, open(out, "wb") as f: shutil.copyfileobj(resp, f, 1 << 20)
+    print(f"Wrote downloaded file → {out}")
 
 def main(argv=None):
     p = argparse.ArgumentParser(description="Fetch or generate small DEMs for tests/demos.")
@@ -2,18 +2,39 @@
 """
 Fetch OSM pedestrian edges for a bounding box using UrbanAccess, save to GeoJSON.
 
+Results are cached on disk per bounding box (see CACHE_DIR), so repeat runs over
+the same area skip the download. Pass --refresh to ignore the cache.
+
 Usage:
   python scripts/fetch_paths.py --bbox -84.30 30.43 -84.28 30.46 --out data/paths_osm.geojson
 """
 import argparse
+import os
+import pathlib
+import shutil
+import time
 import geopandas as gpd
 import urbanaccess as ua
+from ada_slope.io import VECTOR_ENGINE
 
 PEDESTRIAN_TAGS = {"footway","path","pedestrian","steps","living_street","residential"}
+CACHE_DIR = pathlib.Path(os.getenv("ADA_SLOPE_CACHE", pathlib.Path.home() / ".ada_slope_cache"))
+CACHE_TTL = 30 * 24 * 3600  # seconds before a cached download is fetched again
+
+def cache_path(bbox):
+    """Cache file for the pedestrian edges of *bbox*, keyed on its rounded corners."""
+    key = "_".join(f"{v:.6f}" for v in bbox)
+    return CACHE_DIR / f"osm_paths_{key}.geojson"
 
-def main(bbox, out_path):
+def main(bbox, out_path, refresh=False):
     # bbox = [minx, miny, maxx, maxy] in WGS84 -> convert to tuple
     bbox_tuple = tuple(bbox)
+    cached = cache_path(bbox_tuple)
+    if not refresh and cached.exists() and time.time() - cached.stat().st_mtime < CACHE_TTL:
+        shutil.copyfile(cached, out_path)
+        print(f"Wrote {out_path} from cache {cached}")
+        return
+
     nodes, edges = ua.osm.load.ua_network_from_bbox(bbox=bbox_tuple)
     
     # Check available columns
@@ -38,8 +59,10 @@ def main(bbox, out_path):
     print(f"Found {len(gdf)} pedestrian edges after filtering")
     
     if len(gdf) > 0:
-        gdf.to_file(out_path, driver="GeoJSON")
+        gdf.to_file(out_path, driver="GeoJSON", engine=VECTOR_ENGINE)
         print(f"Wrote {out_path} with {len(gdf)} features")
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out_path, cached)
     else:
         print("No pedestrian edges found to save")
 
@@ -47,5 +70,6 @@ if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--bbox", type=float, nargs=4, required=True, help="minx miny maxx maxy (lon/lat WGS84)")
     ap.add_argument("--out", default="data/paths_osm.geojson")
+    ap.add_argument("--refresh", action="store_true", help="download again even if cached")
     a = ap.parse_args()
-    main(a.bbox, a.out)
+    main(a.bbox, a.out, a.refresh)
@@ -40,9 +40,12 @@ def demonstrate_gradient_computation():
         logger.info("-" * 40)
         
         # Compute gradients manually for demonstration
-        gy, gx = np.gradient(dem, 1.0, 1.0)  # 1m pixel spacing
-        slope_magnitude = np.sqrt(gx**2 + gy**2)
-        slope_percentage = slope_magnitude * 100
+        # float32 DEM and spacing keep the gradient and slope in float32
+        dem = dem.astype(np.float32, copy=False)
+        gy, gx = np.gradient(dem, np.float32(1.0), np.float32(1.0))  # 1m pixel spacing
+        # sqrt(gx² + gy²) as percent, in one buffer (no squared/summed temporaries)
+        slope_percentage = np.hypot(gx, gy)
+        slope_percentage *= 100
         
         # Statistics
         max_slope = np.max(slope_percentage)
@@ -103,7 +106,7 @@ def create_linear_ramp(size=20):
     """Create a linear ramp with 5% slope in X direction."""
     x = np.arange(size, dtype=np.float32)
     # 5% slope = 0.05m rise per 1m horizontal
-    ramp = (x * 0.05)[None, :].repeat(size, axis=0)
+    ramp = np.broadcast_to((x * 0.05)[None, :], (size, size))  # view, no copy
     return ramp + 100.0  # Base elevation 100m
 
 def create_step_function(size=20):
@@ -117,11 +120,15 @@ def create_hill_shape(size=20):
     """Create a hill-shaped DEM."""
     center = size // 2
     y, x = np.ogrid[:size, :size]
-    # Gaussian hill shape
-    distance_sq = (x - center)**2 + (y - center)**2
+    # Gaussian hill shape, built in place in the one broadcast (size, size) array
+    height = np.add((x - center)**2, (y - center)**2, dtype=np.float64)
     max_dist_sq = 2 * center**2
-    height = 10 * np.exp(-3 * distance_sq / max_dist_sq)
-    return height + 100.0
+    height *= -3
+    height /= max_dist_sq
+    np.exp(height, out=height)
+    height *= 10
+    height += 100.0
+    return height
 
 def demonstrate_mathematical_concepts():
     """Demonstrate the mathematical formulas step by step."""
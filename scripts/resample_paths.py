@@ -1,30 +1,78 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import geopandas as gpd
-from shapely.geometry import LineString
+import numpy as np
+import shapely
 from ada_slope.core import convert_polygons_to_lines
 from ada_slope.io import ensure_vector_matches_raster_crs as align_crs
+from ada_slope.io import read_geodata, write_geodata
 
+# Below this many lines a thread pool costs more than it saves
+PARALLEL_MIN_LINES = 10_000
 
-def generate_points_along_line(line, distance_interval):
+
+def _resample_lines(lines, distance_interval):
     """
-    Given a LineString and a distance interval (in meters),
-    returns a list of Points evenly spaced along the line.
+    Points every distance_interval along each line in an array of LineStrings,
+    starting at 0 and stopping before the line's end (as np.arange would), so
+    fractional intervals and lengths are honored.
+    Returns the Points of all lines in order and the number of points per line.
+
+    Interpolates linearly on the lines' vertex coordinates with NumPy rather than
+    one GEOS interpolate per point.
+    """
+    n_points = np.ceil(shapely.length(lines) / float(distance_interval)).astype(np.int64)
+    coords, idx = shapely.get_coordinates(lines, return_index=True)
+    if not n_points.any():
+        return shapely.points(np.empty((0, 2))), n_points
+
+    # Cumulative arc length of all lines on one axis, with a unit gap between
+    # consecutive lines; samples never reach a line's end, so never the gap
+    same = idx[1:] == idx[:-1]
+    step = np.where(same, np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1])), 1.0)
+    cum = np.concatenate(([0.0], np.cumsum(step)))
+    start = cum[np.searchsorted(idx, np.arange(len(lines))).clip(max=len(idx) - 1)]
+
+    offsets = np.repeat(np.cumsum(n_points) - n_points, n_points)
+    distances = (np.arange(n_points.sum()) - offsets) * float(distance_interval)
+    distances = distances + np.repeat(start, n_points)
+    x = np.interp(distances, cum, coords[:, 0])
+    y = np.interp(distances, cum, coords[:, 1])
+    return shapely.points(x, y), n_points
+
+
+def _resample_lines_parallel(lines, distance_interval, max_workers=None):
+    """
+    _resample_lines over chunks of lines on a thread pool. Shapely releases the
+    GIL while reading coordinates and building points, so large inputs scale
+    with the number of cores; small ones are resampled serially.
     """
-    points = []
-    total_length = line.length
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(lines) < PARALLEL_MIN_LINES:
+        return _resample_lines(lines, distance_interval)
 
-    for dist in range(0, int(total_length), distance_interval):
-        point = line.interpolate(dist)
-        points.append(point)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = list(pool.map(lambda chunk: _resample_lines(chunk, distance_interval),
+                               np.array_split(lines, workers)))
+    points, counts = zip(*chunks)
+    return np.concatenate(points), np.concatenate(counts)
 
-    return points
+
+def generate_points_along_line(line, distance_interval):
+    """
+    Given a LineString and a distance interval (in meters),
+    returns an array of Points evenly spaced along the line.
+    """
+    return _resample_lines(np.array([line]), distance_interval)[0]
 
 
-def resample_paths_to_points(path_fp, output_fp, interval_meters=5, dem_fp=None):
+def resample_paths_to_points(path_fp, output_fp, interval_meters=5, dem_fp=None, max_workers=None):
     """
     Resamples each LineString in a path GeoDataFrame into evenly spaced points.
     Tags each point with a 'path_id' corresponding to the original feature.
     """
-    gdf_paths = gpd.read_file(path_fp)
+    gdf_paths = read_geodata(path_fp)
     gdf_paths = convert_polygons_to_lines(gdf_paths)
     if dem_fp:
         gdf_paths = align_crs(gdf_paths, dem_fp)
@@ -32,16 +80,11 @@ def resample_paths_to_points(path_fp, output_fp, interval_meters=5, dem_fp=None)
     if gdf_paths.crs.to_epsg() != 26917:
         gdf_paths = gdf_paths.to_crs(epsg=26917)
 
-    all_points = []
-    path_ids = []
-
-    for idx, row in gdf_paths.iterrows():
-        line = row.geometry
-
-        if isinstance(line, LineString):
-            points = generate_points_along_line(line, interval_meters)
-            all_points.extend(points)
-            path_ids.extend([idx] * len(points))  # assign path_id based on row index
+    # Resample every line in one pass over the flat coordinate arrays
+    geoms = gdf_paths.geometry.values
+    is_line = np.isin(shapely.get_type_id(geoms), [shapely.GeometryType.LINESTRING, shapely.GeometryType.LINEARRING])
+    all_points, n_points = _resample_lines_parallel(geoms[is_line], interval_meters, max_workers)
+    path_ids = np.repeat(gdf_paths.index[is_line], n_points)  # assign path_id based on row index
 
     # Create output GeoDataFrame
     gdf_points = gpd.GeoDataFrame({
@@ -49,7 +92,7 @@ def resample_paths_to_points(path_fp, output_fp, interval_meters=5, dem_fp=None)
         "geometry": all_points
     }, crs=gdf_paths.crs)
 
-    gdf_points.to_file(output_fp, driver="GeoJSON")
+    write_geodata(gdf_points, output_fp)
     print(f"Resampled points with path IDs saved to: {output_fp}")
     print(f"Total points generated: {len(gdf_points)}")
 
@@ -1,5 +1,6 @@
-import geopandas as gpd
-import rasterio
+import numpy as np
+
+from ada_slope.io import read_geodata, sample_points_in_raster_crs, write_geodata
 
 
 def sample_elevation_at_points(points_fp, raster_fp, output_fp):
@@ -10,32 +11,17 @@ def sample_elevation_at_points(points_fp, raster_fp, output_fp):
     """
 
     # Step 1: Load the GeoDataFrame of resampled points
-    gdf_points = gpd.read_file(points_fp)
-
-    # Step 2: Open the elevation raster (DEM)
-    with rasterio.open(raster_fp) as src:
-
-        # Step 2a: Reproject points to match the raster's CRS if different
-        if gdf_points.crs != src.crs:
-            gdf_points = gdf_points.to_crs(src.crs)  # Reproject geometries
-            # Forcefully overwrite CRS metadata to match raster
-            gdf_points.set_crs(src.crs, inplace=True, allow_override=True)
-
-        # Step 3: Extract coordinates from point geometries
-        coords = [(pt.x, pt.y) for pt in gdf_points.geometry]
+    gdf_points = read_geodata(points_fp)
 
-        # Step 4: Sample elevation values at each point's location
-        elevations = list(src.sample(coords))
+    # Step 2: Reproject the points to the raster's CRS and sample elevation values
+    # at each point's location; NoData pixels and points outside the raster come back NaN
+    gdf_points = sample_points_in_raster_crs(gdf_points, raster_fp)
 
-        # Step 5: Flatten the elevation results and handle NoData values
-        nodata = src.nodata or -9999
-        gdf_points["elevation"] = [
-            val[0] if val and val[0] != nodata else None
-            for val in elevations
-        ]
+    # float32 holds any terrestrial elevation to within a millimeter at half the size
+    gdf_points["elevation"] = gdf_points["elevation"].to_numpy().astype(np.float32)
 
-    # Step 6: Save the output GeoJSON file with new elevation data
-    gdf_points.to_file(output_fp, driver="GeoJSON")
+    # Step 3: Save the output GeoJSON file with new elevation data
+    write_geodata(gdf_points, output_fp)
     print(f"Elevation-sampled points saved to: {output_fp}")
 
 
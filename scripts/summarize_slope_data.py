@@ -1,25 +1,22 @@
-import geopandas as gpd
 import os
 import json
 from pathlib import Path
 import logging
 
+import numpy as np
+
 from ada_slope.config import DEFAULT
+from ada_slope.io import iter_attributes
+from add_gitkeep import add_gitkeeps
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# List of relative paths where we want .gitkeep files
-folders = [
-    "data/raw",
-    "data/processed",
-    "notebooks",
-    "scripts",
-    "outputs/maps",
-    "outputs/reports",
-    "docs",
-]
+MD_TEMPLATE = """# ADA Slope Compliance Summary
 
+| Metric | Value |
+|--------|-------|
+{rows}"""
 
 def summarize_slope_compliance(slope_fp: str | None = None, output_md_fp: str | None = None, output_json_fp: str | None = None):
     """
@@ -32,14 +29,15 @@ def summarize_slope_compliance(slope_fp: str | None = None, output_md_fp: str |
     output_md_fp = output_md_fp or str(Path(DEFAULT.outputs_dir) / DEFAULT.report_md)
     output_json_fp = output_json_fp or str(Path(DEFAULT.outputs_dir) / "summaries" / "slope_summary.json")
 
-    # Step 1: Load the slope segment GeoDataFrame
-    gdf = gpd.read_file(slope_fp)
-
-    # Step 2: Compute statistics
-    total_segments = len(gdf)
-    ada_compliant = gdf["ada_compliant"].sum()
+    # Step 1-2: Stream the compliance flags in batches (geometries aren't needed)
+    # and keep running counts, so memory doesn't grow with the file
+    total_segments = ada_compliant = 0
+    for batch in iter_attributes(slope_fp, ["ada_compliant"]):
+        compliant = batch["ada_compliant"].to_numpy(dtype=bool, na_value=False)
+        total_segments += compliant.size
+        ada_compliant += int(np.count_nonzero(compliant))
     non_compliant = total_segments - ada_compliant
-    compliance_pct = round((ada_compliant / total_segments) * 100, 2)
+    compliance_pct = round(ada_compliant * 100.0 / total_segments, 2) if total_segments else 0.0
 
     # Step 3: Prepare summary dictionary
     summary = {
@@ -50,16 +48,8 @@ def summarize_slope_compliance(slope_fp: str | None = None, output_md_fp: str |
     }
 
     # Step 4: Create Markdown output
-    md_lines = [
-        "# ADA Slope Compliance Summary\n",
-        "| Metric | Value |",
-        "|--------|-------|",
-    ]
-    for key, value in summary.items():
-        pretty_key = key.replace("_", " ").title()
-        md_lines.append(f"| {pretty_key} | {value} |")
-
-    md_text = "\n".join(md_lines)
+    rows = "\n".join(f"| {key.replace('_', ' ').title()} | {value} |" for key, value in summary.items())
+    md_text = MD_TEMPLATE.format(rows=rows)
 
     # Safe write the markdown and JSON outputs
     if output_md_fp:
@@ -75,15 +65,6 @@ def summarize_slope_compliance(slope_fp: str | None = None, output_md_fp: str |
         logger.info("JSON summary saved to: %s", output_json_fp)
 
 
-def add_gitkeeps(base_path: Path = Path(".")):
-    for rel in folders:
-        folder = (base_path / rel)
-        folder.mkdir(parents=True, exist_ok=True)
-        keep_path = folder / ".gitkeep"
-        keep_path.touch(exist_ok=True)
-        logger.info(".gitkeep added in %s", folder)
-
-
 if __name__ == "__main__":
     summarize_slope_compliance(
         slope_fp="data/processed/fsu_slope_segments.geojson",
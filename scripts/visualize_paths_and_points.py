@@ -1,5 +1,47 @@
-import geopandas as gpd
-import matplotlib.pyplot as plt
+import os
+import sys
+
+import matplotlib
+import numpy as np
+import shapely
+
+from ada_slope.io import read_geodata
+
+# Render off-screen when there is no display to show the figure on
+HEADLESS = sys.platform.startswith("linux") and not os.environ.get("DISPLAY")
+if HEADLESS:
+    matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.colors import ListedColormap  # noqa: E402
+
+DPI = 150
+# Above this many points the point layer is binned to the output pixel grid
+# instead of drawing one marker per point
+MAX_MARKER_POINTS = 50_000
+
+
+def _plot_points_binned(ax, gdf_points, fig):
+    """Draw points as an image of the output pixels that contain at least one point.
+
+    One np.histogram2d over the coordinates replaces per-marker drawing, so
+    rendering cost no longer grows with the number of points.
+    """
+    xy = shapely.get_coordinates(gdf_points.geometry.values)
+    (xmin, ymin), (xmax, ymax) = xy.min(axis=0), xy.max(axis=0)
+    # one bin per output pixel of the axes
+    box = ax.get_position()
+    width = max(int(box.width * fig.get_figwidth() * DPI), 1)
+    height = max(int(box.height * fig.get_figheight() * DPI), 1)
+    counts, _, _ = np.histogram2d(xy[:, 1], xy[:, 0], bins=(height, width), range=[[ymin, ymax], [xmin, xmax]])
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    ax.imshow(
+        np.ma.masked_equal(counts, 0), extent=(xmin, xmax, ymin, ymax), origin="lower",
+        cmap=ListedColormap(["crimson"]), interpolation="nearest", zorder=2,
+    )
+    # imshow snaps the view to the points; keep the paths' extent as well
+    ax.set_xlim(min(xlim[0], xmin), max(xlim[1], xmax))
+    ax.set_ylim(min(ylim[0], ymin), max(ylim[1], ymax))
+    ax.plot([], [], "o", color="crimson", label="Resampled Points")  # legend entry
 
 
 def plot_paths_and_points(paths_fp, points_fp):
@@ -9,19 +51,23 @@ def plot_paths_and_points(paths_fp, points_fp):
     """
 
     # Load the preprocessed pedestrian paths (LineStrings)
-    gdf_paths = gpd.read_file(paths_fp)
+    gdf_paths = read_geodata(paths_fp)
 
     # Load the resampled points generated along the paths
-    gdf_points = gpd.read_file(points_fp)
+    gdf_points = read_geodata(points_fp)
 
     # Create a matplotlib figure and axis
     fig, ax = plt.subplots(figsize=(12, 12))
 
     # Plot the paths first (background layer)
-    gdf_paths.plot(ax=ax, color="steelblue", linewidth=1, label="Paths")
+    # (layers are rasterized: thousands of vector paths dominate save time otherwise)
+    gdf_paths.plot(ax=ax, color="steelblue", linewidth=1, label="Paths", rasterized=True)
 
     # Plot the resampled points on top (foreground layer)
-    gdf_points.plot(ax=ax, color="crimson", markersize=8, label="Resampled Points")
+    if len(gdf_points) > MAX_MARKER_POINTS:
+        _plot_points_binned(ax, gdf_points, fig)
+    else:
+        gdf_points.plot(ax=ax, color="crimson", markersize=8, label="Resampled Points", rasterized=True)
 
     # Set plot title
     ax.set_title("FSU Campus Pedestrian Paths and Resampled Points", fontsize=16)
@@ -33,10 +79,11 @@ def plot_paths_and_points(paths_fp, points_fp):
     plt.legend()
 
     # Save the figure as a PNG file to the outputs/maps directory
-    plt.savefig("outputs/maps/fsu_paths_and_points_preview.png", dpi=300)
+    plt.savefig("outputs/maps/fsu_paths_and_points_preview.png", dpi=DPI)
 
     # Display the plot interactively
-    plt.show()
+    if not HEADLESS:
+        plt.show()
 
 
 if __name__ == "__main__":
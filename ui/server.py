@@ -1,80 +1,127 @@
 #!/usr/bin/env python3
 """
-Simple Flask API backend for ADA Slope Compliance Tool UI.
+Simple FastAPI backend for ADA Slope Compliance Tool UI.
 Handles file uploads and calls the lean pipeline scripts.
 """
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
+import asyncio
+import json
 import os
-import subprocess
+import sys
 import tempfile
 import uuid
-import json
 from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, File, Form, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse
+
+try:  # orjson is optional; it serializes the result GeoJSON much faster
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    orjson = None
+    FastJSONResponse = JSONResponse
 
-app = Flask(__name__)
-CORS(app)
+# The pipeline scripts are imported once and called in-process rather than
+# re-launching Python (and re-importing rasterio/geopandas) for every request
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+sys.path.insert(0, str(ROOT_DIR / "legacy"))
+from ada_slope import _kernels  # noqa: E402
+import eval_ada  # noqa: E402
+
+# The analysis runs on worker threads, where numba's TBB layer hangs at process exit
+_kernels.prefer_omp_threading()
+
+app = FastAPI(title="ADA Slope Compliance Tool UI", default_response_class=FastJSONResponse)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 # Configuration
 UPLOAD_DIR = Path("temp_uploads")
 OUTPUT_DIR = Path("temp_outputs")
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
+STATIC_DIR = Path(".").resolve()
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+WORKERS = int(os.getenv("UI_WORKERS", "4"))
 
-@app.route('/')
-def index():
-    """Serve the UI"""
-    return send_from_directory('.', 'index.html')
+async def save_upload(file: UploadFile, dest: Path):
+    """Copy an upload to *dest* in chunks without blocking the event loop"""
+    with open(dest, 'wb') as f:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            await asyncio.to_thread(f.write, chunk)
 
-@app.route('/<path:filename>')
-def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory('.', filename)
+@app.get('/api/health')
+def health_check():
+    """Health check endpoint"""
+    return {'status': 'healthy'}
+
+@app.get('/api/results/{job_id}')
+def get_results(job_id: str):
+    """Get analysis results"""
+    result_path = OUTPUT_DIR / f"{job_id}_result.geojson"
+    
+    if not result_path.exists():
+        return JSONResponse({'error': 'Results not found'}, status_code=404)
+    
+    # The file already is JSON; send it as-is instead of parsing and re-encoding it
+    return FileResponse(result_path, media_type='application/json')
 
-@app.route('/api/upload', methods=['POST'])
-def upload_files():
+@app.post('/api/upload')
+async def upload_files(
+    dem: Optional[UploadFile] = File(None),
+    paths: Optional[UploadFile] = File(None),
+    running_threshold: float = Form(5.0),
+    cross_threshold: float = Form(2.083),
+    interval_m: float = Form(2.0),
+    bbox: str = Form(''),  # Format: "minlon,minlat,maxlon,maxlat"
+):
     """Handle file uploads and start processing"""
     try:
         job_id = str(uuid.uuid4())
         
         # Check for required DEM file
-        if 'dem' not in request.files:
-            return jsonify({'error': 'DEM file is required'}), 400
+        if dem is None:
+            return JSONResponse({'error': 'DEM file is required'}, status_code=400)
         
-        dem_file = request.files['dem']
-        if dem_file.filename == '':
-            return jsonify({'error': 'No DEM file selected'}), 400
+        if not dem.filename:
+            return JSONResponse({'error': 'No DEM file selected'}, status_code=400)
         
         # Save DEM file
         dem_path = UPLOAD_DIR / f"{job_id}_dem.tif"
-        dem_file.save(dem_path)
+        saves = [save_upload(dem, dem_path)]
         
         # Handle paths file (optional)
         paths_path = None
-        if 'paths' in request.files and request.files['paths'].filename != '':
-            paths_file = request.files['paths']
+        if paths is not None and paths.filename:
             paths_path = UPLOAD_DIR / f"{job_id}_paths.geojson"
-            paths_file.save(paths_path)
+            saves.append(save_upload(paths, paths_path))
+        
+        # Write both files concurrently; the disk writes run in worker threads
+        await asyncio.gather(*saves)
         
         # Get parameters
         params = {
-            'running_threshold': float(request.form.get('running_threshold', 5.0)),
-            'cross_threshold': float(request.form.get('cross_threshold', 2.083)),
-            'interval_m': float(request.form.get('interval_m', 2.0)),
-            'bbox': request.form.get('bbox', '')  # Format: "minlon,minlat,maxlon,maxlat"
+            'running_threshold': running_threshold,
+            'cross_threshold': cross_threshold,
+            'interval_m': interval_m,
+            'bbox': bbox
         }
         
-        # Start processing in background (simplified for demo)
-        result = process_ada_analysis(job_id, dem_path, paths_path, params)
+        # The UI waits for the result, so the analysis runs in a worker thread
+        # and the event loop keeps serving other uploads meanwhile
+        result = await asyncio.to_thread(process_ada_analysis, job_id, dem_path, paths_path, params)
         
-        return jsonify({
+        # Built directly so the GeoJSON skips FastAPI's generic encoder pass
+        return FastJSONResponse({
             'job_id': job_id,
             'status': 'completed',
             'result': result
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSONResponse({'error': str(e)}, status_code=500)
 
 def process_ada_analysis(job_id, dem_path, paths_path, params):
     """Process ADA compliance analysis"""
@@ -83,54 +130,37 @@ def process_ada_analysis(job_id, dem_path, paths_path, params):
         
         if paths_path:
             # Use provided paths file
-            cmd = [
-                'python', '../scripts/eval_ada.py',
-                '--dem', str(dem_path),
-                '--paths', str(paths_path),
-                '--out', str(output_path),
-                '--running-thr', str(params['running_threshold']),
-                '--cross-thr', str(params['cross_threshold']),
-                '--interval-m', str(params['interval_m'])
-            ]
+            paths_file = paths_path
         else:
             # Fetch paths from OSM using bbox
             bbox = params['bbox'].split(',')
             if len(bbox) != 4:
                 raise ValueError("Invalid bounding box format")
             
-            # First fetch paths
+            # First fetch paths (this might fail due to UrbanAccess issue, or
+            # UrbanAccess not being installed at all)
             temp_paths = OUTPUT_DIR / f"{job_id}_temp_paths.geojson"
-            fetch_cmd = [
-                'python', '../scripts/fetch_paths.py',
-                '--bbox'] + bbox + [
-                '--out', str(temp_paths)
-            ]
-            
-            # Run fetch command (this might fail due to UrbanAccess issue)
             try:
-                subprocess.run(fetch_cmd, check=True, capture_output=True, text=True)
+                import fetch_paths
+                fetch_paths.main([float(v) for v in bbox], str(temp_paths))
                 paths_file = temp_paths
-            except subprocess.CalledProcessError as e:
+            except Exception:
+                paths_file = None
+            if paths_file is None or not paths_file.exists():
                 # Fallback: create sample data
                 paths_file = create_sample_paths(bbox, temp_paths)
-            
-            # Then run evaluation
-            cmd = [
-                'python', '../scripts/eval_ada.py',
-                '--dem', str(dem_path),
-                '--paths', str(paths_file),
-                '--out', str(output_path),
-                '--running-thr', str(params['running_threshold']),
-                '--cross-thr', str(params['cross_threshold']),
-                '--interval-m', str(params['interval_m'])
-            ]
         
-        # Run the analysis
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
+        # Run the analysis; eval_ada reports bad input with SystemExit
+        try:
+            eval_ada.main(
+                str(dem_path), str(paths_file), str(output_path),
+                interval_m=params['interval_m'],
+                run_thr=params['running_threshold'],
+                cross_thr=params['cross_threshold'],
+            )
+        except (Exception, SystemExit) as e:
             # If analysis fails, return error details
-            error_msg = result.stderr or result.stdout or "Analysis failed"
+            error_msg = str(e) or "Analysis failed"
             if "DEM CRS" in error_msg and "degrees" in error_msg:
                 return {
                     'error': 'DEM must be in projected coordinate system (meters). Please reproject your DEM using QGIS or gdalwarp.',
@@ -140,14 +170,17 @@ def process_ada_analysis(job_id, dem_path, paths_path, params):
         
         # Read and return results
         if output_path.exists():
-            with open(output_path, 'r') as f:
-                geojson_data = json.load(f)
+            # Parsed once and passed through as-is; orjson parses it several times faster
+            data = output_path.read_bytes()
+            geojson_data = orjson.loads(data) if orjson else json.loads(data)
             
             # Calculate summary statistics
             features = geojson_data.get('features', [])
             total = len(features)
-            compliant = sum(1 for f in features 
-                          if f['properties'].get('running_ok') and f['properties'].get('cross_ok'))
+            compliant = sum(
+                1 for f in features
+                if f['properties'].get('running_ok') and f['properties'].get('cross_ok')
+            )
             
             return {
                 'geojson': geojson_data,
@@ -205,24 +238,23 @@ def create_sample_paths(bbox, output_path):
     
     return output_path
 
-@app.route('/api/results/<job_id>')
-def get_results(job_id):
-    """Get analysis results"""
-    result_path = OUTPUT_DIR / f"{job_id}_result.geojson"
-    
-    if not result_path.exists():
-        return jsonify({'error': 'Results not found'}), 404
-    
-    with open(result_path, 'r') as f:
-        return jsonify(json.load(f))
+@app.get('/')
+def index():
+    """Serve the UI"""
+    return FileResponse(STATIC_DIR / 'index.html')
 
-@app.route('/api/health')
-def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy'})
+@app.get('/{filename:path}')
+def serve_static(filename: str):
+    """Serve static files"""
+    path = (STATIC_DIR / filename).resolve()
+    if not path.is_relative_to(STATIC_DIR) or not path.is_file():
+        return JSONResponse({'error': 'Not found'}, status_code=404)
+    return FileResponse(path)
 
 if __name__ == '__main__':
+    import uvicorn
+
     print("Starting ADA Slope Compliance Tool API...")
     print("UI available at: http://localhost:5000")
     print("API available at: http://localhost:5000/api/")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    uvicorn.run("server:app", host='0.0.0.0', port=5000, workers=WORKERS)
@@ -2,6 +2,7 @@
 """
 Startup script for ADA Slope Compliance Tool UI
 """
+import os
 import sys
 import subprocess
 from pathlib import Path
@@ -9,12 +10,12 @@ from pathlib import Path
 def check_dependencies():
     """Check if required dependencies are installed"""
     try:
-        import flask
-        import flask_cors
-        print("✓ Flask dependencies available")
+        import fastapi
+        import uvicorn
+        print("✓ FastAPI dependencies available")
         return True
     except ImportError:
-        print("✗ Flask dependencies missing")
+        print("✗ FastAPI dependencies missing")
         return False
 
 def install_dependencies():
@@ -34,7 +35,7 @@ def install_dependencies():
         return False
 
 def start_server():
-    """Start the Flask development server"""
+    """Start the API server under uvicorn"""
     print("\n" + "="*50)
     print("🚀 Starting ADA Slope Compliance Tool UI")
     print("="*50)
@@ -46,9 +47,11 @@ def start_server():
     print("📖 Use QGIS or gdalwarp to reproject geographic DEMs")
     print("="*50)
     
-    # Import and run the server
-    from server import app
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Run the server with a few worker processes. The app is only imported in the
+    # workers, so this launcher never loads the analysis stack (or numba) itself
+    import uvicorn
+    workers = int(os.getenv("UI_WORKERS", "4"))
+    uvicorn.run("server:app", host='0.0.0.0', port=5000, workers=workers)
 
 if __name__ == "__main__":
     print("ADA Slope Compliance Tool - UI Launcher")
@@ -69,7 +72,7 @@ if __name__ == "__main__":
         print("   Make sure you're running from within the ADA-Slope-Compliance-Tool project")
         sys.exit(1)
     
-    # Check Flask dependencies
+    # Check FastAPI dependencies
     if not check_dependencies():
         print("\n📦 Installing UI dependencies...")
         if not install_dependencies():